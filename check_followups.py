@@ -15,10 +15,18 @@ Requires .env:
 """
 
 import os
+import functools
 import logging
+import queue
+import threading
+import orjson
 import requests
 from datetime import datetime, timezone
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from resilience import CircuitBreaker
 
 load_dotenv()
 
@@ -26,6 +34,15 @@ HUBSPOT_ACCESS_TOKEN = os.getenv("HUBSPOT_ACCESS_TOKEN")
 SLACK_TOFU_REPLIES_WEBHOOK_URL = os.getenv("SLACK_TOFU_REPLIES_WEBHOOK_URL")
 HUBSPOT_BASE_URL = "https://api.hubapi.com"
 
+# HubSpot batch endpoints accept at most 100 inputs per call.
+HUBSPOT_BATCH_SIZE = 100
+
+_UTC = timezone.utc
+
+# (connect, read) timeouts in seconds so a hung socket can't stall the run.
+HUBSPOT_TIMEOUT = (5, 30)
+SLACK_TIMEOUT = 10
+
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s  %(levelname)s  %(message)s",
@@ -33,66 +50,124 @@ logging.basicConfig(
 log = logging.getLogger(__name__)
 
 
-def hubspot_headers() -> dict:
-    return {
-        "Authorization": f"Bearer {HUBSPOT_ACCESS_TOKEN}",
-        "Content-Type": "application/json",
-    }
+# ── HTTP sessions ─────────────────────────────────────────────────────────────
+
+def _make_session() -> requests.Session:
+    """Session with keep-alive pooling and jittered backoff on 429/5xx/connection errors."""
+    session = requests.Session()
+    retry = Retry(
+        total=3,
+        backoff_factor=1,
+        backoff_jitter=0.5,
+        backoff_max=30,
+        status_forcelist=[429, 500, 502, 503, 504, 529],
+        allowed_methods=["GET", "POST", "PATCH"],
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry))
+    return session
+
+
+HUBSPOT_BREAKER = CircuitBreaker("HubSpot")
+SLACK_BREAKER = CircuitBreaker("Slack")
+
+# HubSpot auth lives on its own session so the bearer token is never sent to Slack.
+HUBSPOT_SESSION = _make_session()
+HUBSPOT_SESSION.headers.update({
+    "Authorization": f"Bearer {HUBSPOT_ACCESS_TOKEN}",
+    "Content-Type": "application/json",
+})
+SLACK_SESSION = _make_session()
+
+
+# ── Slack delivery queue ──────────────────────────────────────────────────────
+
+_slack_queue: "queue.Queue[tuple[str, dict]]" = queue.Queue()
+
+
+def _slack_worker():
+    """Drain queued Slack messages one at a time."""
+    while True:
+        name, message = _slack_queue.get()
+        try:
+            if not SLACK_BREAKER.allow():
+                log.error(f"  Slack reminder skipped for {name}: Slack is failing repeatedly")
+                continue
+            resp = SLACK_SESSION.post(
+                SLACK_TOFU_REPLIES_WEBHOOK_URL,
+                data=orjson.dumps(message),
+                headers={"Content-Type": "application/json"},
+                timeout=SLACK_TIMEOUT,
+            )
+            resp.raise_for_status()
+            SLACK_BREAKER.record(True)
+            log.info(f"  Slack reminder sent for {name}")
+        except Exception as e:
+            SLACK_BREAKER.record(False)
+            log.error(f"  Slack reminder failed for {name}: {e}")
+        finally:
+            _slack_queue.task_done()
+
+
+threading.Thread(target=_slack_worker, name="slack-worker", daemon=True).start()
+
+
+@functools.lru_cache(maxsize=4096)
+def _ms_to_date(ms: int) -> str:
+    """Format a HubSpot ms timestamp as YYYY-MM-DD (UTC)."""
+    return datetime.fromtimestamp(ms / 1000, tz=_UTC).strftime("%Y-%m-%d")
 
 
 def search_postponed_contacts() -> list[dict]:
     """Find contacts where is_postponed=true AND followup_date <= today."""
-    today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    today = datetime.now(_UTC).strftime("%Y-%m-%d")
     # HubSpot date properties are stored as midnight UTC ms timestamps.
     # Convert today's date to ms for the LTE filter.
-    today_dt = datetime.strptime(today, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+    today_dt = datetime.strptime(today, "%Y-%m-%d").replace(tzinfo=_UTC)
     today_ms = str(int(today_dt.timestamp() * 1000))
 
+    body = {
+        "filterGroups": [
+            {
+                "filters": [
+                    {
+                        "propertyName": "is_postponed",
+                        "operator": "EQ",
+                        "value": "true",
+                    },
+                    {
+                        "propertyName": "followup_date",
+                        "operator": "LTE",
+                        "value": today_ms,
+                    },
+                ]
+            }
+        ],
+        "properties": [
+            "firstname",
+            "lastname",
+            "email",
+            "company",
+            "linkedin",
+            "latest_outbound_campaign",
+            "latest_response_text",
+            "followup_date",
+            "outbound_platform",
+        ],
+        "limit": 100,
+    }
+
     contacts = []
-    after = None
 
     while True:
-        body = {
-            "filterGroups": [
-                {
-                    "filters": [
-                        {
-                            "propertyName": "is_postponed",
-                            "operator": "EQ",
-                            "value": "true",
-                        },
-                        {
-                            "propertyName": "followup_date",
-                            "operator": "LTE",
-                            "value": today_ms,
-                        },
-                    ]
-                }
-            ],
-            "properties": [
-                "firstname",
-                "lastname",
-                "email",
-                "company",
-                "jobtitle",
-                "linkedin",
-                "latest_outbound_campaign",
-                "latest_response_text",
-                "followup_date",
-                "outbound_platform",
-            ],
-            "limit": 100,
-        }
-        if after:
-            body["after"] = after
-
-        resp = requests.post(
+        resp = HUBSPOT_SESSION.post(
             f"{HUBSPOT_BASE_URL}/crm/v3/objects/contacts/search",
-            headers=hubspot_headers(),
-            json=body,
+            data=orjson.dumps(body),
+            timeout=HUBSPOT_TIMEOUT,
         )
         resp.raise_for_status()
-        data = resp.json()
+        data = orjson.loads(resp.content)
 
         for result in data.get("results", []):
             contacts.append(result)
@@ -102,12 +177,25 @@ def search_postponed_contacts() -> list[dict]:
         after = next_page.get("after")
         if not after:
             break
+        body["after"] = after
 
     return contacts
 
 
+_SLACK_TEMPLATE = (
+    ":alarm_clock: *Time to Follow Up!*\n"
+    "*Lead:* {name}{company_part}\n"
+    "*Platform:* {platform}\n"
+    "*Campaign:* {campaign}\n"
+    "{contact_line}\n"
+    "*Original reply:* _{reply}_\n"
+    "*Follow-up date:* {followup_date}\n"
+    "*HubSpot:* https://app.hubspot.com/contacts/{contact_id}"
+)
+
+
 def send_followup_slack(contact: dict):
-    """Send a Slack reminder for a contact whose follow-up date has arrived."""
+    """Queue a Slack reminder for a contact whose follow-up date has arrived."""
     if not SLACK_TOFU_REPLIES_WEBHOOK_URL:
         log.warning("SLACK_TOFU_REPLIES_WEBHOOK_URL not set — skipping")
         return
@@ -125,50 +213,55 @@ def send_followup_slack(contact: dict):
     # Format followup_date from ms timestamp to readable date
     if followup_date:
         try:
-            dt = datetime.fromtimestamp(int(followup_date) / 1000, tz=timezone.utc)
-            followup_date = dt.strftime("%Y-%m-%d")
+            followup_date = _ms_to_date(int(followup_date))
         except (ValueError, TypeError):
             pass
 
     if len(reply) > 300:
         reply = reply[:300] + "..."
 
-    contact_id = contact.get("id", "")
-    contact_line = f"*Email:* {email}" if email else f"*LinkedIn:* {linkedin}"
-
     message = {
-        "text": (
-            f":alarm_clock: *Time to Follow Up!*\n"
-            f"*Lead:* {name}"
-            + (f" at {company}" if company else "")
-            + f"\n*Platform:* {platform}\n"
-            f"*Campaign:* {campaign}\n"
-            f"{contact_line}\n"
-            f"*Original reply:* _{reply}_\n"
-            f"*Follow-up date:* {followup_date}\n"
-            f"*HubSpot:* https://app.hubspot.com/contacts/{contact_id}"
-        )
+        "text": _SLACK_TEMPLATE.format_map({
+            "name": name,
+            "company_part": f" at {company}" if company else "",
+            "platform": platform,
+            "campaign": campaign,
+            "contact_line": f"*Email:* {email}" if email else f"*LinkedIn:* {linkedin}",
+            "reply": reply,
+            "followup_date": followup_date,
+            "contact_id": contact.get("id", ""),
+        })
     }
 
-    try:
-        resp = requests.post(SLACK_TOFU_REPLIES_WEBHOOK_URL, json=message)
-        resp.raise_for_status()
-        log.info(f"  Slack reminder sent for {name}")
-    except Exception as e:
-        log.error(f"  Slack reminder failed for {name}: {e}")
-
-
-def clear_postponed_flag(contact_id: str):
-    """Set is_postponed to 'false' so we don't re-notify."""
-    try:
-        resp = requests.patch(
-            f"{HUBSPOT_BASE_URL}/crm/v3/objects/contacts/{contact_id}",
-            headers=hubspot_headers(),
-            json={"properties": {"is_postponed": "false"}},
-        )
-        resp.raise_for_status()
-    except Exception as e:
-        log.error(f"  Failed to clear is_postponed for contact {contact_id}: {e}")
+    _slack_queue.put((name, message))
+
+
+def clear_postponed_flags(contact_ids: list[str]):
+    """Set is_postponed to 'false' so we don't re-notify, 100 contacts per call."""
+    for i in range(0, len(contact_ids), HUBSPOT_BATCH_SIZE):
+        if not HUBSPOT_BREAKER.allow():
+            log.error(
+                f"  HubSpot is failing repeatedly — leaving is_postponed set on "
+                f"{len(contact_ids) - i} remaining contacts"
+            )
+            return
+        batch = contact_ids[i : i + HUBSPOT_BATCH_SIZE]
+        try:
+            resp = HUBSPOT_SESSION.post(
+                f"{HUBSPOT_BASE_URL}/crm/v3/objects/contacts/batch/update",
+                data=orjson.dumps({
+                    "inputs": [
+                        {"id": contact_id, "properties": {"is_postponed": "false"}}
+                        for contact_id in batch
+                    ]
+                }),
+                timeout=HUBSPOT_TIMEOUT,
+            )
+            resp.raise_for_status()
+            HUBSPOT_BREAKER.record(True)
+        except Exception as e:
+            HUBSPOT_BREAKER.record(False)
+            log.error(f"  Failed to clear is_postponed for contacts {', '.join(batch)}: {e}")
 
 
 def main():
@@ -185,15 +278,17 @@ def main():
         log.info("Nothing to do.")
         return
 
-    sent = 0
     for contact in contacts:
         props = contact.get("properties", {})
         name = f"{props.get('firstname', '')} {props.get('lastname', '')}".strip()
         log.info(f"  Processing: {name} (id={contact.get('id')})")
 
         send_followup_slack(contact)
-        clear_postponed_flag(contact["id"])
-        sent += 1
+    sent = len(contacts)
+
+    # Wait for queued Slack reminders to finish, then clear every flag in bulk.
+    _slack_queue.join()
+    clear_postponed_flags([contact["id"] for contact in contacts])
 
     log.info(f"=== Done — sent {sent} follow-up reminders ===")
 
@@ -11,13 +11,25 @@ Usage:
 
 import argparse
 import base64
+import collections
+import functools
+import hashlib
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from itertools import islice
 
+import orjson
 import requests
+from bson.binary import Binary, BinaryVectorDtype
 from openai import OpenAI
-from pymongo import MongoClient
+from pymongo import ASCENDING, MongoClient
+from pymongo.errors import BulkWriteError, OperationFailure
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from resilience import CircuitBreaker
 
 # ============================================================================
 # CONFIGURATION
@@ -31,52 +43,118 @@ OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
 
 EMBEDDING_MODEL = "text-embedding-3-small"
 EMBEDDING_DIMENSIONS = 1536
+EMBEDDING_BATCH_SIZE = 100
+EMBEDDING_MAX_WORKERS = 8
+EMBEDDING_CACHE_COLLECTION = "embedding_cache"
+# Segments shorter than this ("Yeah.", "<inaudible>") carry no searchable content
+# and are not worth an embedding.
+MIN_SEGMENT_CHARS = 16
+# Gong's transcript endpoint accepts up to 100 callIds per request.
+TRANSCRIPT_BATCH_SIZE = 100
+# Gong allows ~3 requests/second per key; a few in flight keeps the pipeline busy
+# without tripping 429s (which HTTP_RETRY backs off on anyway).
+TRANSCRIPT_FETCH_WORKERS = 4
+
+# Retries for transient failures: 429/5xx and connection errors only.
+HTTP_RETRY = Retry(
+    total=3,
+    backoff_factor=1,
+    backoff_jitter=0.5,
+    backoff_max=30,
+    status_forcelist=[429, 500, 502, 503, 504, 529],
+    allowed_methods=["GET", "POST"],
+    respect_retry_after_header=True,
+    raise_on_status=False,
+)
+OPENAI_MAX_RETRIES = 3
+
+# (connect, read) timeouts in seconds so a hung socket can't stall an ingest.
+HTTP_TIMEOUT = (5, 30)
+OPENAI_TIMEOUT = 30
 
 # ============================================================================
 # CLIENTS
 # ============================================================================
 
+GONG_BREAKER = CircuitBreaker("Gong")
+
+GONG_SESSION = requests.Session()
+GONG_SESSION.mount("https://", HTTPAdapter(max_retries=HTTP_RETRY))
+# Basic Auth never changes for the life of the process, so encode it once.
+_GONG_AUTH = base64.b64encode(f"{GONG_API_KEY}:{GONG_API_SECRET}".encode("ascii")).decode("ascii")
+GONG_SESSION.headers.update({
+    "Authorization": f"Basic {_GONG_AUTH}",
+    "Content-Type": "application/json",
+})
+
 
 def gong_request(method, endpoint, json_data=None, params=None):
     """Make a request to Gong API with Basic Auth."""
-    auth_string = f"{GONG_API_KEY}:{GONG_API_SECRET}"
-    base64_auth = base64.b64encode(auth_string.encode("ascii")).decode("ascii")
+    if method not in ("GET", "POST"):
+        return None
 
-    headers = {
-        "Authorization": f"Basic {base64_auth}",
-        "Content-Type": "application/json",
-    }
+    if not GONG_BREAKER.allow():
+        raise RuntimeError(
+            f"Gong API unavailable: {GONG_BREAKER.failures} consecutive failures, not retrying yet"
+        )
 
     url = f"{GONG_BASE_URL}{endpoint}"
+    body = orjson.dumps(json_data) if json_data is not None else None
 
     try:
-        if method == "GET":
-            response = requests.get(url, headers=headers, params=params)
-        elif method == "POST":
-            response = requests.post(url, headers=headers, json=json_data)
-        else:
-            return None
+        response = GONG_SESSION.request(
+            method, url, params=params, data=body, timeout=HTTP_TIMEOUT
+        )
+        # Client errors (bad call ID etc.) say nothing about Gong's health.
+        GONG_BREAKER.record(response.status_code < 500 and response.status_code != 429)
 
         if response.status_code == 200:
-            return response.json()
+            return orjson.loads(response.content)
         else:
             print(f"Gong API Error: {response.status_code} - {response.text}")
             return None
     except Exception as e:
+        GONG_BREAKER.record(False)
         print(f"Gong API Exception: {e}")
         return None
 
 
 def get_mongo_collection():
     """Get the MongoDB collection for transcript chunks."""
-    client = MongoClient(MONGODB_URI)
+    client = MongoClient(
+        MONGODB_URI, serverSelectionTimeoutMS=5000, connectTimeoutMS=5000, socketTimeoutMS=30000
+    )
     db = client["gong"]
-    return client, db["gong_transcripts"]
+    collection = db["gong_transcripts"]
+    # One chunk per (call, segment start). Makes re-ingesting a call idempotent;
+    # create_index is a no-op when the index already exists.
+    try:
+        collection.create_index(
+            [("call_id", ASCENDING), ("start_time", ASCENDING)],
+            unique=True,
+            name="call_id_start_time_unique",
+        )
+    except OperationFailure as e:
+        print(f"Could not create unique chunk index: {e}")
+    return client, collection
+
+
+def insert_chunks(collection, chunks):
+    """Insert chunk documents, skipping ones already stored. Returns the number inserted."""
+    try:
+        result = collection.insert_many(chunks, ordered=False)
+        return len(result.inserted_ids)
+    except BulkWriteError as e:
+        # 11000 = duplicate key: another ingest (e.g. a concurrent webhook) got there first.
+        errors = e.details.get("writeErrors", [])
+        if any(err.get("code") != 11000 for err in errors):
+            raise
+        return e.details.get("nInserted", 0)
 
 
 def get_openai_client():
     """Get the OpenAI client."""
-    return OpenAI(api_key=OPENAI_API_KEY)
+    return OpenAI(api_key=OPENAI_API_KEY, max_retries=OPENAI_MAX_RETRIES, timeout=OPENAI_TIMEOUT)
 
 
 # ============================================================================
@@ -97,24 +175,41 @@ def fetch_calls(from_date, to_date):
     return result["calls"]
 
 
+def fetch_transcripts(call_ids):
+    """Fetch transcripts for up to TRANSCRIPT_BATCH_SIZE calls in one request.
+
+    Returns a dict of call ID -> transcript segments; calls without a
+    transcript are absent.
+    """
+    # callIds alone selects the calls; a date range would only exclude older ones.
+    payload = {"filter": {"callIds": list(call_ids)}}
+
+    transcripts = {}
+    while True:
+        result = gong_request("POST", "/v2/calls/transcript", json_data=payload)
+        if not result:
+            break
+        for call_transcript in result.get("callTranscripts", []):
+            transcripts[call_transcript.get("callId")] = call_transcript.get("transcript", [])
+
+        # Large transcripts can spill over several pages.
+        cursor = result.get("records", {}).get("cursor")
+        if not cursor:
+            break
+        payload["cursor"] = cursor
+
+    return transcripts
+
+
 def fetch_transcript(call_id):
     """Fetch the full transcript for a single call."""
-    payload = {
-        "filter": {
-            "fromDateTime": (datetime.now() - timedelta(days=365)).strftime(
-                "%Y-%m-%dT00:00:00Z"
-            ),
-            "toDateTime": datetime.now().strftime("%Y-%m-%dT23:59:59Z"),
-            "callIds": [call_id],
-        }
-    }
+    return fetch_transcripts([call_id]).get(call_id, [])
 
-    result = gong_request("POST", "/v2/calls/transcript", json_data=payload)
-    if not result or not result.get("callTranscripts"):
-        return []
 
-    call_transcript_data = result["callTranscripts"][0]
-    return call_transcript_data.get("transcript", [])
+@functools.lru_cache(maxsize=1024)
+def _parse_iso(value):
+    """Parse a Gong ISO-8601 timestamp (trailing Z allowed) into a datetime."""
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
 
 
 def embed_texts(openai_client, texts):
@@ -123,6 +218,133 @@ def embed_texts(openai_client, texts):
     return [item.embedding for item in response.data]
 
 
+def to_bson_vector(embedding):
+    """Pack an embedding as a float32 BSON vector (half the size of a list of doubles)."""
+    return Binary.from_vector(embedding, BinaryVectorDtype.FLOAT32)
+
+
+def _embedding_cache_key(text):
+    """Content hash for the embedding cache; includes the model so a model change misses."""
+    return hashlib.sha256(f"{EMBEDDING_MODEL}:{text}".encode("utf-8")).hexdigest()
+
+
+def embed_all(openai_client, texts, cache=None):
+    """Embed texts, returning embeddings in the same order as ``texts``.
+
+    Repeated texts (filler like "Yes." or "Right.") are only embedded once.
+    If ``cache`` (the embedding_cache collection) is given, texts embedded by
+    earlier runs are read from it and new embeddings are written back.
+    """
+    keys = [_embedding_cache_key(text) for text in texts]
+    unique = dict(zip(keys, texts))
+
+    embeddings_by_key = {}
+    if cache is not None:
+        for doc in cache.find({"_id": {"$in": list(unique)}}):
+            embeddings_by_key[doc["_id"]] = doc["embedding"].as_vector().data
+
+    missing = [key for key in unique if key not in embeddings_by_key]
+    if missing:
+        new_embeddings = embed_batches(openai_client, [unique[key] for key in missing])
+        embeddings_by_key.update(zip(missing, new_embeddings))
+
+        if cache is not None:
+            try:
+                cache.insert_many(
+                    [
+                        {"_id": key, "embedding": to_bson_vector(embedding)}
+                        for key, embedding in zip(missing, new_embeddings)
+                    ],
+                    ordered=False,
+                )
+            except BulkWriteError:
+                pass  # Another run cached some of the same texts first.
+
+    return [embeddings_by_key[key] for key in keys]
+
+
+def embed_batches(openai_client, texts):
+    """Embed texts in batches of EMBEDDING_BATCH_SIZE, running the batches concurrently.
+
+    Results come back in the same order as ``texts``.
+    """
+    batches = [
+        texts[i : i + EMBEDDING_BATCH_SIZE] for i in range(0, len(texts), EMBEDDING_BATCH_SIZE)
+    ]
+    if not batches:
+        return []
+    if len(batches) == 1:
+        return embed_texts(openai_client, batches[0])
+
+    with ThreadPoolExecutor(max_workers=min(EMBEDDING_MAX_WORKERS, len(batches))) as executor:
+        results = executor.map(lambda batch: embed_texts(openai_client, batch), batches)
+        return [embedding for result in results for embedding in result]
+
+
+def build_chunks(call, segments):
+    """Turn a call's transcript segments into chunk documents plus their texts."""
+    call_date = call.get("started")
+    # Call-level fields are identical for every chunk, so build them once.
+    base = {
+        "call_id": call.get("id"),
+        "call_title": call.get("title", "Untitled Call"),
+        "call_date": _parse_iso(call_date) if call_date else None,
+        "call_url": call.get("url", ""),
+        "participants": [
+            p.get("emailAddress", "") for p in call.get("parties", []) if p.get("emailAddress")
+        ],
+        "ingested_at": datetime.utcnow(),
+    }
+
+    chunks = []
+    chunk_texts = []
+
+    for segment in segments:
+        sentences = segment.get("sentences", [])
+        if not sentences:
+            continue
+        full_text = " ".join([s.get("text", "") for s in sentences])
+        if len(full_text.strip()) < MIN_SEGMENT_CHARS:
+            continue
+
+        start_time = sentences[0].get("start")
+        end_time = sentences[-1].get("end")
+
+        chunks.append(
+            {
+                **base,
+                "speaker_id": segment.get("speakerId"),
+                "topic": segment.get("topic", ""),
+                "text": full_text,
+                "start_time": start_time,
+                "end_time": end_time,
+            }
+        )
+        chunk_texts.append(full_text)
+
+    return chunks, chunk_texts
+
+
+def iter_transcript_batches(call_batches):
+    """Yield (batch, transcripts) for each batch of calls, in order.
+
+    At most TRANSCRIPT_FETCH_WORKERS batches are fetched ahead of the consumer;
+    the next request is submitted as each batch is handed out.
+    """
+    remaining = iter(call_batches)
+    with ThreadPoolExecutor(max_workers=TRANSCRIPT_FETCH_WORKERS) as executor:
+        def submit(batch):
+            return batch, executor.submit(fetch_transcripts, [call.get("id") for call in batch])
+
+        pending = collections.deque(submit(b) for b in islice(remaining, TRANSCRIPT_FETCH_WORKERS))
+        while pending:
+            batch, future = pending.popleft()
+            following = next(remaining, None)
+            if following is not None:
+                pending.append(submit(following))
+            yield batch, future.result()
+
+
 def ingest_calls(days_back=90):
     """Main ingestion function. Returns count of calls ingested."""
     # Validate env vars
@@ -139,94 +361,66 @@ def ingest_calls(days_back=90):
         raise ValueError(f"Missing required environment variables: {', '.join(missing)}")
 
     mongo_client, collection = get_mongo_collection()
-    openai_client = get_openai_client()
-
-    to_date = datetime.now().strftime("%Y-%m-%d")
-    from_date = (datetime.now() - timedelta(days=days_back)).strftime("%Y-%m-%d")
+    try:
+        embedding_cache = collection.database[EMBEDDING_CACHE_COLLECTION]
+        openai_client = get_openai_client()
 
-    print(f"Fetching Gong calls from {from_date} to {to_date}...")
-    calls = fetch_calls(from_date, to_date)
-    print(f"Found {len(calls)} calls")
+        to_date = datetime.now().strftime("%Y-%m-%d")
+        from_date = (datetime.now() - timedelta(days=days_back)).strftime("%Y-%m-%d")
 
-    # Get already-ingested call IDs
-    existing_call_ids = set(collection.distinct("call_id"))
-    print(f"Already ingested: {len(existing_call_ids)} calls")
+        print(f"Fetching Gong calls from {from_date} to {to_date}...")
+        calls = fetch_calls(from_date, to_date)
+        print(f"Found {len(calls)} calls")
 
-    ingested_count = 0
+        # Get already-ingested call IDs
+        existing_call_ids = set(collection.distinct("call_id"))
+        print(f"Already ingested: {len(existing_call_ids)} calls")
 
-    for i, call in enumerate(calls):
-        call_id = call.get("id")
-        if call_id in existing_call_ids:
-            continue
+        new_calls = [call for call in calls if call.get("id") not in existing_call_ids]
+        ingested_count = 0
 
-        call_title = call.get("title", "Untitled Call")
-        call_date = call.get("started")
-        call_url = call.get("url", "")
-        participants = [
-            p.get("emailAddress", "") for p in call.get("parties", []) if p.get("emailAddress")
+        # Transcripts are fetched in bulk, a batch of call IDs per request, in the
+        # background while earlier calls are embedded.
+        call_batches = [
+            new_calls[i : i + TRANSCRIPT_BATCH_SIZE]
+            for i in range(0, len(new_calls), TRANSCRIPT_BATCH_SIZE)
         ]
+        calls_with_transcripts = (
+            (call, transcripts.get(call.get("id")))
+            for batch, transcripts in iter_transcript_batches(call_batches)
+            for call in batch
+        )
+        for i, (call, segments) in enumerate(calls_with_transcripts):
+            call_id = call.get("id")
+            call_title = call.get("title", "Untitled Call")
 
-        print(f"  [{i + 1}/{len(calls)}] Processing: {call_title} ({call_id})")
+            print(f"  [{i + 1}/{len(new_calls)}] Processing: {call_title} ({call_id})")
 
-        # Fetch transcript
-        segments = fetch_transcript(call_id)
-        if not segments:
-            print(f"    No transcript found, skipping")
-            continue
+            if not segments:
+                print(f"    No transcript found, skipping")
+                continue
 
-        # Build chunk texts and metadata
-        chunks = []
-        chunk_texts = []
+            # Build chunk texts and metadata
+            chunks, chunk_texts = build_chunks(call, segments)
 
-        for segment in segments:
-            sentences = segment.get("sentences", [])
-            full_text = " ".join(s.get("text", "") for s in sentences)
-            if not full_text.strip():
+            if not chunk_texts:
+                print(f"    No text segments, skipping")
                 continue
 
-            start_time = sentences[0].get("start") if sentences else None
-            end_time = sentences[-1].get("end") if sentences else None
-
-            chunks.append(
-                {
-                    "call_id": call_id,
-                    "call_title": call_title,
-                    "call_date": datetime.fromisoformat(call_date.replace("Z", "+00:00"))
-                    if call_date
-                    else None,
-                    "call_url": call_url,
-                    "participants": participants,
-                    "speaker_id": segment.get("speakerId"),
-                    "topic": segment.get("topic", ""),
-                    "text": full_text,
-                    "start_time": start_time,
-                    "end_time": end_time,
-                    "ingested_at": datetime.utcnow(),
-                }
-            )
-            chunk_texts.append(full_text)
-
-        if not chunk_texts:
-            print(f"    No text segments, skipping")
-            continue
+            # Embed in batches of 100
+            all_embeddings = embed_all(openai_client, chunk_texts, embedding_cache)
 
-        # Embed in batches of 100
-        all_embeddings = []
-        for batch_start in range(0, len(chunk_texts), 100):
-            batch = chunk_texts[batch_start : batch_start + 100]
-            embeddings = embed_texts(openai_client, batch)
-            all_embeddings.extend(embeddings)
+            # Attach embeddings to chunks
+            for chunk, embedding in zip(chunks, all_embeddings):
+                chunk["embedding"] = to_bson_vector(embedding)
 
-        # Attach embeddings to chunks
-        for chunk, embedding in zip(chunks, all_embeddings):
-            chunk["embedding"] = embedding
-
-        # Insert into MongoDB
-        collection.insert_many(chunks)
-        ingested_count += 1
-        print(f"    Inserted {len(chunks)} segments")
+            # Insert into MongoDB
+            inserted = insert_chunks(collection, chunks)
+            ingested_count += 1
+            print(f"    Inserted {inserted} segments")
+    finally:
+        mongo_client.close()
 
-    mongo_client.close()
     print(f"\nDone! Ingested {ingested_count} new calls.")
     return ingested_count
 
@@ -246,6 +440,7 @@ def ingest_single_call(call_id):
         raise ValueError(f"Missing required environment variables: {', '.join(missing)}")
 
     mongo_client, collection = get_mongo_collection()
+    embedding_cache = collection.database[EMBEDDING_CACHE_COLLECTION]
     openai_client = get_openai_client()
 
     # Check if already ingested
@@ -255,9 +450,10 @@ def ingest_single_call(call_id):
         return False
 
     # Fetch call metadata
+    now = datetime.now()
     params = {
-        "fromDateTime": (datetime.now() - timedelta(days=365)).strftime("%Y-%m-%dT00:00:00Z"),
-        "toDateTime": datetime.now().strftime("%Y-%m-%dT23:59:59Z"),
+        "fromDateTime": (now - timedelta(days=365)).strftime("%Y-%m-%dT00:00:00Z"),
+        "toDateTime": now.strftime("%Y-%m-%dT23:59:59Z"),
     }
     calls_result = gong_request("GET", "/v2/calls", params=params)
 
@@ -273,13 +469,6 @@ def ingest_single_call(call_id):
         print(f"Call {call_id} not found in Gong")
         return False
 
-    call_title = call_data.get("title", "Untitled Call")
-    call_date = call_data.get("started")
-    call_url = call_data.get("url", "")
-    participants = [
-        p.get("emailAddress", "") for p in call_data.get("parties", []) if p.get("emailAddress")
-    ]
-
     # Fetch transcript
     segments = fetch_transcript(call_id)
     if not segments:
@@ -288,36 +477,7 @@ def ingest_single_call(call_id):
         return False
 
     # Build chunks
-    chunks = []
-    chunk_texts = []
-
-    for segment in segments:
-        sentences = segment.get("sentences", [])
-        full_text = " ".join(s.get("text", "") for s in sentences)
-        if not full_text.strip():
-            continue
-
-        start_time = sentences[0].get("start") if sentences else None
-        end_time = sentences[-1].get("end") if sentences else None
-
-        chunks.append(
-            {
-                "call_id": call_id,
-                "call_title": call_title,
-                "call_date": datetime.fromisoformat(call_date.replace("Z", "+00:00"))
-                if call_date
-                else None,
-                "call_url": call_url,
-                "participants": participants,
-                "speaker_id": segment.get("speakerId"),
-                "topic": segment.get("topic", ""),
-                "text": full_text,
-                "start_time": start_time,
-                "end_time": end_time,
-                "ingested_at": datetime.utcnow(),
-            }
-        )
-        chunk_texts.append(full_text)
+    chunks, chunk_texts = build_chunks(call_data, segments)
 
     if not chunk_texts:
         mongo_client.close()
@@ -325,18 +485,14 @@ def ingest_single_call(call_id):
         return False
 
     # Embed
-    all_embeddings = []
-    for batch_start in range(0, len(chunk_texts), 100):
-        batch = chunk_texts[batch_start : batch_start + 100]
-        embeddings = embed_texts(openai_client, batch)
-        all_embeddings.extend(embeddings)
+    all_embeddings = embed_all(openai_client, chunk_texts, embedding_cache)
 
     for chunk, embedding in zip(chunks, all_embeddings):
-        chunk["embedding"] = embedding
+        chunk["embedding"] = to_bson_vector(embedding)
 
-    collection.insert_many(chunks)
+    inserted = insert_chunks(collection, chunks)
     mongo_client.close()
-    print(f"Ingested call {call_id}: {len(chunks)} segments")
+    print(f"Ingested call {call_id}: {inserted} segments")
     return True
 
 
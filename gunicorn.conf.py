@@ -0,0 +1,34 @@
+"""
+Gunicorn settings for hubspot_gpt_api
+=====================================
+
+Picked up automatically by `gunicorn hubspot_gpt_api:app` when run from the
+repo root. Every route is I/O-bound (Gong, OpenAI, MongoDB), so each worker
+runs a thread pool instead of handling one request at a time.
+"""
+
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+
+# Processes for CPU, threads for overlapping upstream waits. Each worker holds
+# its own OpenAI/Mongo clients and caches, so the default is capped to keep
+# small instances within memory; set WEB_CONCURRENCY to override.
+workers = int(os.environ.get("WEB_CONCURRENCY", min(2 * multiprocessing.cpu_count() + 1, 4)))
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", 16))
+
+# Import the app once in the master so workers fork with it already loaded.
+# The Mongo client is created lazily, so no sockets are shared across fork.
+preload_app = True
+
+# Heartbeat files on tmpfs: a disk-backed /tmp can stall workers on slow I/O.
+worker_tmp_dir = "/dev/shm"
+
+# Keep client connections open between GPT tool calls instead of
+# re-doing the TCP/TLS handshake on every request.
+keepalive = 65
+
+# /gong/ingest embeds whole transcripts inline, so allow long requests.
+timeout = 120
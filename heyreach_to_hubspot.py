@@ -14,19 +14,33 @@ Setup:
     HUBSPOT_ACCESS_TOKEN=your_hubspot_access_token
     OPENAI_API_KEY=your_openai_api_key (optional — falls back to keywords)
     SLACK_TOFU_REPLIES_WEBHOOK_URL=your_slack_webhook (optional)
+    HEYREACH_RATE_LIMIT=300 / HEYREACH_RATE_PERIOD=60 (optional — requests per seconds)
 
   Run: python heyreach_to_hubspot.py
 """
 
 import argparse
+import collections
+import functools
+import hashlib
 import os
 import json
 import logging
 import re
+import sqlite3
+import threading
 import time
+import orjson
 import requests
-from datetime import datetime, timedelta, timezone
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from itertools import islice
+from typing import Iterator
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from resilience import RateLimiter
 
 load_dotenv()
 
@@ -41,6 +55,19 @@ HEYREACH_BASE_URL = "https://api.heyreach.io/api/public"
 HUBSPOT_BASE_URL = "https://api.hubapi.com"
 
 STATE_FILE = "heyreach_hubspot_last_run.json"
+OPENAI_CACHE_FILE = "heyreach_openai_cache.sqlite3"
+OPENAI_MODEL = "gpt-4o-mini"
+
+# Campaigns whose conversations are paged from HeyReach at the same time.
+HEYREACH_MAX_WORKERS = 8
+# HeyReach's public API allows 300 requests per minute per API key; every
+# pager thread shares this budget. Override if the account's limit differs.
+HEYREACH_RATE_LIMIT = int(os.getenv("HEYREACH_RATE_LIMIT", "300"))
+HEYREACH_RATE_PERIOD = float(os.getenv("HEYREACH_RATE_PERIOD", "60"))
+# Concurrent HubSpot write requests; HubSpot allows ~100 requests per 10 seconds.
+HUBSPOT_MAX_WORKERS = 5
+# Concurrent OpenAI sentiment requests; keep under the OpenAI account's RPM.
+OPENAI_MAX_WORKERS = 16
 
 logging.basicConfig(
     level=logging.INFO,
@@ -59,145 +86,350 @@ if OPENAI_API_KEY:
         log.warning("openai package not installed — falling back to keyword classification")
 
 
+# ── HTTP sessions ─────────────────────────────────────────────────────────────
+
+def _make_session(idempotent: bool = True) -> requests.Session:
+    """Session with keep-alive pooling and backoff on 429/5xx/connection errors.
+
+    With idempotent=False only requests the server never acted on are retried
+    (429 and connection failures), so a create is never sent twice.
+    """
+    session = requests.Session()
+    retry = Retry(
+        total=3,
+        read=None if idempotent else 0,
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504] if idempotent else [429],
+        allowed_methods=["GET", "POST"],
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry))
+    return session
+
+
+# Each service gets its own session so API credentials never leak to another host.
+heyreach_session = _make_session()
+heyreach_session.headers.update({"X-API-KEY": HEYREACH_API_KEY, "Content-Type": "application/json"})
+hubspot_session = _make_session()
+hubspot_session.headers.update({
+    "Authorization": f"Bearer {HUBSPOT_ACCESS_TOKEN}",
+    "Content-Type": "application/json",
+})
+# Single-contact creates aren't idempotent; a retried 5xx could create a duplicate.
+hubspot_create_session = _make_session(idempotent=False)
+hubspot_create_session.headers.update(hubspot_session.headers)
+slack_session = _make_session()
+
+
+# ── Rate limiting ─────────────────────────────────────────────────────────────
+
+HEYREACH_LIMITER = RateLimiter(HEYREACH_RATE_LIMIT, HEYREACH_RATE_PERIOD)
+# HubSpot private apps get 10 requests per second (burst included).
+HUBSPOT_LIMITER = RateLimiter(10, 1)
+
+
+def hubspot_throttle(resp: requests.Response):
+    """Pause for the rest of HubSpot's one-second window once its budget is spent."""
+    if resp.headers.get("X-HubSpot-RateLimit-Secondly-Remaining") == "0":
+        time.sleep(1)
+
+
 # ── State helpers ─────────────────────────────────────────────────────────────
 
 def load_last_run() -> str | None:
     """Return the ISO timestamp of the last successful run, or None for first run."""
-    if os.path.exists(STATE_FILE):
+    try:
         with open(STATE_FILE) as f:
-            data = json.load(f)
-            return data.get("last_run")
-    return None
+            return json.load(f).get("last_run")
+    except FileNotFoundError:
+        return None
 
 
 def save_last_run(ts: datetime):
-    with open(STATE_FILE, "w") as f:
+    # Write-then-rename so a crash mid-write can't leave a truncated state file.
+    tmp = STATE_FILE + ".tmp"
+    with open(tmp, "w") as f:
         json.dump({"last_run": ts.isoformat()}, f)
+    os.replace(tmp, STATE_FILE)
 
 
 # ── HeyReach helpers ─────────────────────────────────────────────────────────
 
-def heyreach_headers() -> dict:
-    return {"X-API-KEY": HEYREACH_API_KEY, "Content-Type": "application/json"}
-
-
-def get_all_campaigns() -> list[dict]:
-    """Fetch all HeyReach campaigns with pagination."""
-    campaigns = []
+def iter_campaigns() -> Iterator[dict]:
+    """Yield HeyReach campaigns page by page, fetching the next page only when needed."""
     offset = 0
     limit = 100
 
     while True:
-        resp = requests.post(
+        HEYREACH_LIMITER.acquire()
+        resp = heyreach_session.post(
             f"{HEYREACH_BASE_URL}/campaign/GetAll",
-            headers=heyreach_headers(),
-            json={"offset": offset, "limit": limit},
+            data=orjson.dumps({"offset": offset, "limit": limit}),
         )
         resp.raise_for_status()
-        data = resp.json()
+        data = orjson.loads(resp.content)
 
         items = data.get("items", data.get("campaigns", []))
         if not items:
             if isinstance(data, list):
-                campaigns.extend(data)
+                yield from data
             break
 
-        campaigns.extend(items)
+        yield from items
 
         total = data.get("totalCount", data.get("total", 0))
         offset += limit
         if offset >= total or len(items) < limit:
             break
 
-        time.sleep(0.2)
 
+def get_all_campaigns(max_campaigns: int = 0) -> list[dict]:
+    """Fetch all HeyReach campaigns, or only the first `max_campaigns` if set."""
+    campaigns = list(islice(iter_campaigns(), max_campaigns or None))
     log.info(f"Found {len(campaigns)} HeyReach campaigns")
     return campaigns
 
 
-def get_conversations_for_campaign(campaign_id: int) -> list[dict]:
-    """Fetch all conversations for a campaign with pagination."""
-    conversations = []
+def conversation_last_activity(conv: dict) -> str:
+    """Timestamp of a conversation's latest message ("" if unknown)."""
+    latest_ts = conv.get("lastMessageAt", "")
+    if not latest_ts:
+        for msg in conv.get("messages", []):
+            ts = msg.get("createdAt", "")
+            if ts and (not latest_ts or str(ts) > str(latest_ts)):
+                latest_ts = ts
+    return str(latest_ts) if latest_ts else ""
+
+
+def iter_conversations_for_campaign(campaign_id: int, since: str | None = None) -> Iterator[dict]:
+    """
+    Yield a campaign's conversations page by page.
+    With `since`, stop paging once a whole page is older than it, as long as
+    every page so far came back most recent first; if HeyReach ever returns
+    them in another order, page through everything. Callers still filter.
+    """
     offset = 0
     limit = 100
+    newest_first = True
+    previous_ts = None
 
     while True:
-        resp = requests.post(
+        HEYREACH_LIMITER.acquire()
+        resp = heyreach_session.post(
             f"{HEYREACH_BASE_URL}/inbox/GetConversationsV2",
-            headers=heyreach_headers(),
-            json={"campaignId": campaign_id, "offset": offset, "limit": limit},
+            data=orjson.dumps({"campaignId": campaign_id, "offset": offset, "limit": limit}),
         )
         resp.raise_for_status()
-        data = resp.json()
+        data = orjson.loads(resp.content)
 
         items = data.get("items", data.get("conversations", []))
         if not items:
             if isinstance(data, list):
-                conversations.extend(data)
+                yield from data
             break
 
-        conversations.extend(items)
+        yield from items
 
         total = data.get("totalCount", data.get("total", 0))
         offset += limit
         if offset >= total or len(items) < limit:
             break
 
-        time.sleep(0.2)
+        if not since or not newest_first:
+            continue
+        page_ts = [conversation_last_activity(item) for item in items]
+        for ts in page_ts:
+            if not ts or (previous_ts is not None and ts > previous_ts):
+                newest_first = False
+                break
+            previous_ts = ts
+        if newest_first and page_ts[0] < since:
+            # Sorted newest first, so the whole page (and all later ones) is older.
+            break
+
+
+def get_conversations_for_campaign(campaign_id: int, since: str | None = None) -> list[dict]:
+    """Fetch all conversations for a campaign (see iter_conversations_for_campaign)."""
+    return list(iter_conversations_for_campaign(campaign_id, since))
+
+
+def iter_campaign_conversations(campaigns: list[dict], since: str | None = None
+                                ) -> Iterator[tuple[dict, Future]]:
+    """
+    Yield (campaign, future of its conversations) in campaign order.
+    Up to HEYREACH_MAX_WORKERS campaigns are paged ahead of the consumer; the
+    next one starts as each is handed out, so finished pages don't pile up.
+    """
+    def submit(campaign: dict) -> tuple[dict, Future]:
+        campaign_id = campaign.get("id") or campaign.get("campaignId")
+        return campaign, executor.submit(get_conversations_for_campaign, campaign_id, since)
+
+    remaining = iter(campaigns)
+    with ThreadPoolExecutor(max_workers=HEYREACH_MAX_WORKERS) as executor:
+        pending = collections.deque(submit(c) for c in islice(remaining, HEYREACH_MAX_WORKERS))
+        while pending:
+            campaign, future = pending.popleft()
+            following = next(remaining, None)
+            if following is not None:
+                pending.append(submit(following))
+            yield campaign, future
+
+
+# ── OpenAI response cache ─────────────────────────────────────────────────────
+# Classifications are deterministic (temperature=0), so answers are persisted
+# across runs keyed by a hash of model + prompt. The prompt embeds the full
+# conversation, so a new message naturally produces a new key.
+
+_cache_conn = None
+_cache_lock = threading.Lock()
+
+
+def _cache_db() -> sqlite3.Connection:
+    global _cache_conn
+    if _cache_conn is None:
+        _cache_conn = sqlite3.connect(OPENAI_CACHE_FILE, check_same_thread=False)
+        _cache_conn.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT)")
+    return _cache_conn
+
+
+def _cache_key(prompt: str) -> str:
+    return hashlib.sha1(f"{OPENAI_MODEL}\n{prompt}".encode("utf-8")).hexdigest()
+
 
-    return conversations
+def cache_get(prompt: str):
+    """Return the cached answer for a prompt, or None."""
+    with _cache_lock:
+        row = _cache_db().execute(
+            "SELECT value FROM cache WHERE key = ?", (_cache_key(prompt),)
+        ).fetchone()
+    return json.loads(row[0]) if row else None
+
+
+def cache_set(prompt: str, value):
+    with _cache_lock:
+        db = _cache_db()
+        db.execute(
+            "INSERT OR REPLACE INTO cache (key, value) VALUES (?, ?)",
+            (_cache_key(prompt), json.dumps(value)),
+        )
+        db.commit()
 
 
 # ── OpenAI classification ─────────────────────────────────────────────────────
 
-def openai_classify_sentiment(messages: list[dict]) -> dict | None:
-    """Use OpenAI to classify reply sentiment. Returns None on failure."""
-    if not openai_client:
-        return None
+SENTIMENT_FIELDS = """- "reply_sentiment": one of "Enthusiastic", "Positive", "Neutral", "Negative", "Postponed", "Not Yet Responded"
+- "taken_off_list": "yes" or "no" — is the lead asking to be removed, opting out, unsubscribing, saying "not interested", "remove me", "stop contacting", etc.?
+- "is_postponed": "true" or "false" — is the lead saying "not right now", "reach out later", "busy right now", "maybe next quarter", etc.?
+- "sentiment_notes": brief 1-2 sentence explanation of your classification"""
+
+# Conversations classified per OpenAI request by openai_classify_sentiment_batch.
+SENTIMENT_BATCH_SIZE = 20
 
+
+def _conversation_text(messages: list[dict]) -> str:
     conversation_text = ""
     for msg in messages:
         direction = "OUTBOUND" if msg.get("sender") == "ME" else "INBOUND"
         text = msg.get("body", "")
         conversation_text += f"[{direction}]: {text}\n"
+    return conversation_text
+
 
-    prompt = f"""Analyze this LinkedIn conversation and classify the lead's response.
+def _sentiment_prompt(messages: list[dict]) -> str:
+    return f"""Analyze this LinkedIn conversation and classify the lead's response.
 
 Conversation:
-{conversation_text}
+{_conversation_text(messages)}
 
 Respond with a JSON object (no markdown, no code fences) with these fields:
-- "reply_sentiment": one of "Enthusiastic", "Positive", "Neutral", "Negative", "Postponed", "Not Yet Responded"
-- "taken_off_list": "yes" or "no" — is the lead asking to be removed, opting out, unsubscribing, saying "not interested", "remove me", "stop contacting", etc.?
-- "is_postponed": "true" or "false" — is the lead saying "not right now", "reach out later", "busy right now", "maybe next quarter", etc.?
-- "sentiment_notes": brief 1-2 sentence explanation of your classification"""
+{SENTIMENT_FIELDS}"""
+
+
+def _sentiment_result(result: dict) -> dict:
+    return {
+        "reply_sentiment": result.get("reply_sentiment", "Neutral"),
+        "taken_off_list": result.get("taken_off_list", "no"),
+        "is_postponed": result.get("is_postponed", "false"),
+        "sentiment_notes": result.get("sentiment_notes", ""),
+    }
+
+
+def openai_classify_sentiment(messages: list[dict]) -> dict | None:
+    """Use OpenAI to classify reply sentiment. Returns None on failure."""
+    if not openai_client:
+        return None
+
+    prompt = _sentiment_prompt(messages)
+    cached = cache_get(prompt)
+    if cached:
+        return cached
 
     try:
         response = openai_client.chat.completions.create(
-            model="gpt-4o-mini",
+            model=OPENAI_MODEL,
             messages=[{"role": "user", "content": prompt}],
             temperature=0,
         )
-        result = json.loads(response.choices[0].message.content.strip())
-        return {
-            "reply_sentiment": result.get("reply_sentiment", "Neutral"),
-            "taken_off_list": result.get("taken_off_list", "no"),
-            "is_postponed": result.get("is_postponed", "false"),
-            "sentiment_notes": result.get("sentiment_notes", ""),
-        }
+        classification = _sentiment_result(json.loads(response.choices[0].message.content.strip()))
+        cache_set(prompt, classification)
+        return classification
     except Exception as e:
         log.warning(f"OpenAI sentiment failed, using keywords: {e}")
         return None
 
 
-def openai_classify_sector(campaign_name: str) -> str | None:
-    """Use OpenAI to classify campaign name into a sector. Returns None on failure."""
+def openai_classify_sentiment_batch(conversations: list[list[dict]]) -> list[dict | None]:
+    """
+    Classify several conversations (each a list of messages) in one OpenAI request.
+    Results line up with the input; cached conversations are not resent, and any
+    conversation missing from the batch answer is retried on its own.
+    """
     if not openai_client:
-        return None
+        return [None] * len(conversations)
+
+    # Cache entries are keyed by the single-conversation prompt, so both paths share them.
+    prompts = [_sentiment_prompt(messages) for messages in conversations]
+    results = [cache_get(prompt) for prompt in prompts]
+    pending = [i for i, result in enumerate(results) if not result]
+    if not pending:
+        return results
+
+    sections = "\n".join(
+        f"### Conversation {n}\n{_conversation_text(conversations[i])}" for n, i in enumerate(pending)
+    )
+    prompt = f"""Classify the lead's response in each of the following {len(pending)} LinkedIn conversations.
+
+{sections}
+
+Respond with a JSON array (no markdown, no code fences) containing one object per conversation, with these fields:
+- "idx": the conversation number
+{SENTIMENT_FIELDS}"""
+
+    try:
+        response = openai_client.chat.completions.create(
+            model=OPENAI_MODEL,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0,
+        )
+        for item in json.loads(response.choices[0].message.content.strip()):
+            n = item.get("idx")
+            if isinstance(n, int) and 0 <= n < len(pending):
+                i = pending[n]
+                results[i] = _sentiment_result(item)
+                cache_set(prompts[i], results[i])
+    except Exception as e:
+        log.warning(f"OpenAI batch sentiment failed, classifying individually: {e}")
+
+    for i in pending:
+        if not results[i]:
+            results[i] = openai_classify_sentiment(conversations[i])
+    return results
 
-    prompt = f"""Given this campaign name, classify it into the most specific sector.
 
-Campaign name: "{campaign_name}"
+# Fixed instructions go first, byte-identical on every request, so OpenAI can
+# reuse the prefix; only the short campaign name varies.
+SECTOR_SYSTEM_PROMPT = """Given a campaign name, classify it into the most specific sector.
 
 Pick the single best-fit sector from this list, or identify a more specific sector from the campaign name. NEVER return "Other".
 
@@ -213,13 +445,31 @@ Sectors:
 
 Respond with ONLY the sector name, nothing else."""
 
+
+def openai_classify_sector(campaign_name: str) -> str | None:
+    """Use OpenAI to classify campaign name into a sector. Returns None on failure."""
+    if not openai_client:
+        return None
+
+    user_prompt = f'Campaign name: "{campaign_name}"'
+    cache_prompt = f"{SECTOR_SYSTEM_PROMPT}\n{user_prompt}"
+    cached = cache_get(cache_prompt)
+    if cached:
+        return cached
+
     try:
         response = openai_client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": prompt}],
+            model=OPENAI_MODEL,
+            messages=[
+                {"role": "system", "content": SECTOR_SYSTEM_PROMPT},
+                {"role": "user", "content": user_prompt},
+            ],
             temperature=0,
+            seed=0,
         )
-        return response.choices[0].message.content.strip()
+        sector = response.choices[0].message.content.strip()
+        cache_set(cache_prompt, sector)
+        return sector
     except Exception as e:
         log.warning(f"OpenAI sector failed, using keywords: {e}")
         return None
@@ -264,6 +514,18 @@ NEGATIVE_PHRASES = [
     "we already use", "not looking", "doesn't apply", "spam",
 ]
 
+
+def _phrase_regex(phrases: list[str]) -> re.Pattern:
+    """Compile a phrase list into one case-insensitive alternation."""
+    return re.compile("|".join(re.escape(p) for p in phrases), re.IGNORECASE)
+
+
+_OPT_OUT_RE = _phrase_regex(OPT_OUT_PHRASES)
+_POSTPONE_RE = _phrase_regex(POSTPONE_PHRASES)
+_POSITIVE_RE = _phrase_regex(POSITIVE_PHRASES)
+_ENTHUSIASTIC_RE = _phrase_regex(ENTHUSIASTIC_PHRASES)
+_NEGATIVE_RE = _phrase_regex(NEGATIVE_PHRASES)
+
 SECTOR_PATTERNS = [
     ("webinar outreach", "Webinar Outreach"),
     ("webinar", "Webinar"),
@@ -302,6 +564,15 @@ SECTOR_PATTERNS = [
     ("startup", "Tech"),
 ]
 
+# One zero-width alternative per keyword so finditer reports every keyword
+# occurrence, overlapping or not; the lowest group index found is the first
+# SECTOR_PATTERNS entry that appears in the name, same as a linear scan.
+_SECTOR_RE = re.compile(
+    "|".join(f"(?=(?P<g{i}>{re.escape(kw)}))" for i, (kw, _) in enumerate(SECTOR_PATTERNS)),
+    re.IGNORECASE,
+)
+_SECTOR_NAMES = [sector_name for _, sector_name in SECTOR_PATTERNS]
+
 
 def keyword_classify_sentiment(messages: list[dict]) -> dict:
     """Classify reply sentiment using keyword matching."""
@@ -309,9 +580,9 @@ def keyword_classify_sentiment(messages: list[dict]) -> dict:
     for msg in messages:
         if msg.get("sender") != "ME":
             inbound_text += " " + (msg.get("body", "") or "")
-    inbound_lower = inbound_text.lower().strip()
+    inbound_text = inbound_text.strip()
 
-    if not inbound_lower:
+    if not inbound_text:
         return {
             "reply_sentiment": "Not Yet Responded",
             "taken_off_list": "no",
@@ -319,20 +590,8 @@ def keyword_classify_sentiment(messages: list[dict]) -> dict:
             "sentiment_notes": "No inbound messages found",
         }
 
-    taken_off = "no"
-    for phrase in OPT_OUT_PHRASES:
-        if phrase in inbound_lower:
-            taken_off = "yes"
-            break
-
-    is_postponed = "false"
-    for phrase in POSTPONE_PHRASES:
-        if phrase in inbound_lower:
-            is_postponed = "true"
-            break
-
-    sentiment = "Neutral"
-    notes = "Reply detected, classified by keyword matching."
+    taken_off = "yes" if _OPT_OUT_RE.search(inbound_text) else "no"
+    is_postponed = "true" if _POSTPONE_RE.search(inbound_text) else "false"
 
     if taken_off == "yes":
         sentiment = "Negative"
@@ -340,26 +599,18 @@ def keyword_classify_sentiment(messages: list[dict]) -> dict:
     elif is_postponed == "true":
         sentiment = "Postponed"
         notes = "Lead is interested but wants to revisit later."
+    elif _ENTHUSIASTIC_RE.search(inbound_text):
+        sentiment = "Enthusiastic"
+        notes = "Lead shows strong positive interest."
+    elif _POSITIVE_RE.search(inbound_text):
+        sentiment = "Positive"
+        notes = "Lead shows interest in continuing the conversation."
+    elif _NEGATIVE_RE.search(inbound_text):
+        sentiment = "Negative"
+        notes = "Lead indicates this is not relevant to them."
     else:
-        for phrase in ENTHUSIASTIC_PHRASES:
-            if phrase in inbound_lower:
-                sentiment = "Enthusiastic"
-                notes = "Lead shows strong positive interest."
-                break
-        if sentiment == "Neutral":
-            for phrase in POSITIVE_PHRASES:
-                if phrase in inbound_lower:
-                    sentiment = "Positive"
-                    notes = "Lead shows interest in continuing the conversation."
-                    break
-        if sentiment == "Neutral":
-            for phrase in NEGATIVE_PHRASES:
-                if phrase in inbound_lower:
-                    sentiment = "Negative"
-                    notes = "Lead indicates this is not relevant to them."
-                    break
-        if sentiment == "Neutral":
-            notes = "Reply received but could not determine clear sentiment from keywords."
+        sentiment = "Neutral"
+        notes = "Reply received but could not determine clear sentiment from keywords."
 
     return {
         "reply_sentiment": sentiment,
@@ -371,11 +622,11 @@ def keyword_classify_sentiment(messages: list[dict]) -> dict:
 
 def keyword_classify_sector(campaign_name: str) -> str:
     """Classify campaign name into a sector using keyword matching."""
-    name_lower = campaign_name.lower()
-    for keyword, sector_name in SECTOR_PATTERNS:
-        if keyword in name_lower:
-            return sector_name
-    return "Tech"
+    best = min(
+        (int(m.lastgroup[1:]) for m in _SECTOR_RE.finditer(campaign_name)),
+        default=None,
+    )
+    return _SECTOR_NAMES[best] if best is not None else "Tech"
 
 
 # ── Combined classifiers (OpenAI first, keyword fallback) ─────────────────────
@@ -388,6 +639,23 @@ def classify_reply_sentiment(messages: list[dict]) -> dict:
     return keyword_classify_sentiment(messages)
 
 
+def classify_replies_sentiment(conversations: list[list[dict]]) -> list[dict]:
+    """Classify many conversations — OpenAI in concurrent batches, keywords as fallback."""
+    batches = [
+        conversations[i : i + SENTIMENT_BATCH_SIZE]
+        for i in range(0, len(conversations), SENTIMENT_BATCH_SIZE)
+    ]
+    results = []
+    if batches:
+        with ThreadPoolExecutor(max_workers=min(OPENAI_MAX_WORKERS, len(batches))) as executor:
+            for batch_results in executor.map(openai_classify_sentiment_batch, batches):
+                results.extend(batch_results)
+    return [
+        result or keyword_classify_sentiment(messages)
+        for messages, result in zip(conversations, results)
+    ]
+
+
 def classify_sector(campaign_name: str, cache: dict) -> str:
     """Classify sector — tries OpenAI, falls back to keywords. Caches results."""
     if campaign_name in cache:
@@ -409,44 +677,48 @@ def classify_sector(campaign_name: str, cache: dict) -> str:
 
 # ── Slack notifications ───────────────────────────────────────────────────────
 
-def parse_followup_date(reply_text: str) -> str:
+# (pattern, fixed offset, kind) — checked in order, first match wins.
+_FOLLOWUP_PATTERNS = [
+    (re.compile(r"next quarter"), timedelta(days=90), "fixed"),
+    (re.compile(r"next year"), timedelta(days=365), "fixed"),
+    (re.compile(r"next month"), timedelta(days=30), "fixed"),
+    (re.compile(r"in (\d+)\s*months?"), None, "months"),
+    (re.compile(r"in (\d+)\s*weeks?"), None, "weeks"),
+    (re.compile(r"(\d+)\s*months?"), None, "months"),
+    (re.compile(r"(\d+)\s*weeks?"), None, "weeks"),
+    (re.compile(r"end of year"), None, "end_of_year"),
+    (re.compile(r"after the holidays"), timedelta(days=45), "fixed"),
+    (re.compile(r"beginning of next"), timedelta(days=30), "fixed"),
+    (re.compile(r"q([1-4])"), None, "quarter"),
+]
+
+_QUARTER_START_MONTH = {"1": 1, "2": 4, "3": 7, "4": 10}
+
+
+def parse_followup_date(reply_text: str, today: date | None = None) -> str:
     """Parse a postponed reply to determine when to follow up. Default: 2 weeks."""
-    text = reply_text.lower()
-    now = datetime.now(timezone.utc)
+    return _parse_followup_date(reply_text.lower(), today or datetime.now(timezone.utc).date())
 
-    patterns = [
-        (r"next quarter", timedelta(days=90)),
-        (r"next year", timedelta(days=365)),
-        (r"next month", timedelta(days=30)),
-        (r"in (\d+)\s*months?", None),
-        (r"in (\d+)\s*weeks?", None),
-        (r"(\d+)\s*months?", None),
-        (r"(\d+)\s*weeks?", None),
-        (r"end of year", None),
-        (r"after the holidays", timedelta(days=45)),
-        (r"beginning of next", timedelta(days=30)),
-        (r"q[1-4]", None),
-    ]
 
-    for pattern, delta in patterns:
-        match = re.search(pattern, text)
-        if match:
-            if delta:
-                return (now + delta).strftime("%Y-%m-%d")
-            # Parse numeric values
-            if "month" in pattern:
-                months = int(match.group(1))
-                return (now + timedelta(days=months * 30)).strftime("%Y-%m-%d")
-            if "week" in pattern:
-                weeks = int(match.group(1))
-                return (now + timedelta(weeks=weeks)).strftime("%Y-%m-%d")
-            if "end of year" in pattern:
-                return f"{now.year}-12-31"
-            if pattern.startswith("q"):
-                q = text[match.start() + 1]
-                quarter_month = {"1": 1, "2": 4, "3": 7, "4": 10}.get(q, 1)
-                year = now.year if int(q) > (now.month - 1) // 3 + 1 else now.year + 1
-                return f"{year}-{quarter_month:02d}-01"
+@functools.lru_cache(maxsize=4096)
+def _parse_followup_date(text: str, now: date) -> str:
+    """Cached worker for parse_followup_date; pure in (lower-cased text, today)."""
+    for pattern, delta, kind in _FOLLOWUP_PATTERNS:
+        match = pattern.search(text)
+        if not match:
+            continue
+        if kind == "fixed":
+            return (now + delta).strftime("%Y-%m-%d")
+        if kind == "months":
+            return (now + timedelta(days=int(match.group(1)) * 30)).strftime("%Y-%m-%d")
+        if kind == "weeks":
+            return (now + timedelta(weeks=int(match.group(1)))).strftime("%Y-%m-%d")
+        if kind == "end_of_year":
+            return f"{now.year}-12-31"
+        if kind == "quarter":
+            q = match.group(1)
+            year = now.year if int(q) > (now.month - 1) // 3 + 1 else now.year + 1
+            return f"{year}-{_QUARTER_START_MONTH[q]:02d}-01"
 
     # Default: 2 weeks
     return (now + timedelta(weeks=2)).strftime("%Y-%m-%d")
@@ -458,7 +730,8 @@ def send_postponed_slack_notification(lead: dict):
         log.warning("SLACK_TOFU_REPLIES_WEBHOOK_URL not set — skipping Slack notification")
         return
 
-    followup_date = parse_followup_date(lead.get("latest_response_text", ""))
+    # extract_lead_data already parsed the reply for postponed leads
+    followup_date = lead.get("followup_date") or parse_followup_date(lead.get("latest_response_text", ""))
     name = f"{lead.get('firstname', '')} {lead.get('lastname', '')}".strip()
     company = lead.get("company", "")
     campaign = lead.get("latest_outbound_campaign", "")
@@ -482,7 +755,11 @@ def send_postponed_slack_notification(lead: dict):
     }
 
     try:
-        resp = requests.post(SLACK_TOFU_REPLIES_WEBHOOK_URL, json=message)
+        resp = slack_session.post(
+            SLACK_TOFU_REPLIES_WEBHOOK_URL,
+            data=orjson.dumps(message),
+            headers={"Content-Type": "application/json"},
+        )
         resp.raise_for_status()
         log.info(f"  Slack notification sent for {name} (follow up: {followup_date})")
     except Exception as e:
@@ -491,19 +768,39 @@ def send_postponed_slack_notification(lead: dict):
 
 # ── Lead extraction ───────────────────────────────────────────────────────────
 
+MS_PER_DAY = 86_400_000
+
+
 def to_midnight_ms(ts) -> str:
     """Convert a millisecond timestamp to midnight UTC (required by HubSpot date fields)."""
     try:
         ms = int(ts)
-        dt = datetime.fromtimestamp(ms / 1000, tz=timezone.utc)
-        midnight = dt.replace(hour=0, minute=0, second=0, microsecond=0)
-        return str(int(midnight.timestamp() * 1000))
-    except (ValueError, TypeError, OSError):
+    except (ValueError, TypeError):
         return ""
+    return str(ms - ms % MS_PER_DAY)
 
 
-def extract_lead_data(conversation: dict, campaign_name: str, sector_cache: dict) -> dict | None:
-    """Extract and enrich lead data from a HeyReach conversation."""
+def _to_ms(ts) -> int:
+    """Epoch ms for a HeyReach timestamp (ms number or ISO-8601 string); 0 if unparseable."""
+    try:
+        return int(ts)
+    except (ValueError, TypeError):
+        pass
+    try:
+        dt = datetime.fromisoformat(str(ts).replace("Z", "+00:00"))
+    except ValueError:
+        return 0
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp() * 1000)
+
+
+def extract_lead_data(conversation: dict, campaign_name: str, sector_cache: dict,
+                      sentiment: dict | None = None) -> dict | None:
+    """
+    Extract and enrich lead data from a HeyReach conversation.
+    Pass `sentiment` when the reply was already classified (e.g. in a batch).
+    """
     lead = conversation.get("correspondentProfile", {})
     if not lead:
         return None
@@ -522,32 +819,25 @@ def extract_lead_data(conversation: dict, campaign_name: str, sector_cache: dict
     if not messages:
         return None
 
-    # Separate outbound and inbound messages
-    outbound_messages = []
-    inbound_messages = []
+    # One pass: count each direction and track the latest outbound and inbound message
+    inbound_count = 0
+    latest_outbound = latest_response = None
+    latest_outbound_ms = latest_response_ms = 0
     for msg in messages:
+        ts = msg.get("createdAt")
+        ms = _to_ms(ts) if ts else 0
         if msg.get("sender") == "ME":
-            outbound_messages.append(msg)
+            if ts and (latest_outbound is None or ms > latest_outbound_ms):
+                latest_outbound, latest_outbound_ms = msg, ms
         else:
-            inbound_messages.append(msg)
-
-    has_responded = len(inbound_messages) > 0
-
-    # Get latest outbound date
-    latest_outbound_date = None
-    for msg in outbound_messages:
-        ts = msg.get("createdAt", "")
-        if ts and (latest_outbound_date is None or str(ts) > str(latest_outbound_date)):
-            latest_outbound_date = ts
-
-    # Get latest inbound reply
-    latest_response_text = ""
-    latest_response_date = None
-    for msg in inbound_messages:
-        ts = msg.get("createdAt", "")
-        if ts and (latest_response_date is None or str(ts) > str(latest_response_date)):
-            latest_response_date = ts
-            latest_response_text = msg.get("body", "")
+            inbound_count += 1
+            if ts and (latest_response is None or ms > latest_response_ms):
+                latest_response, latest_response_ms = msg, ms
+
+    has_responded = inbound_count > 0
+    latest_outbound_date = latest_outbound["createdAt"] if latest_outbound else None
+    latest_response_date = latest_response["createdAt"] if latest_response else None
+    latest_response_text = latest_response.get("body", "") if latest_response else ""
 
     # Classify sentiment if lead has replied
     sentiment_data = {
@@ -557,7 +847,7 @@ def extract_lead_data(conversation: dict, campaign_name: str, sector_cache: dict
         "sentiment_notes": "",
     }
     if has_responded:
-        sentiment_data = classify_reply_sentiment(messages)
+        sentiment_data = sentiment or classify_reply_sentiment(messages)
 
     # Classify sector from campaign name
     sector = classify_sector(campaign_name, sector_cache)
@@ -588,17 +878,81 @@ def extract_lead_data(conversation: dict, campaign_name: str, sector_cache: dict
         "followup_date": followup_date,
         "sector": sector,
         "sentiment_notes": sentiment_data["sentiment_notes"],
-        "response_count": str(len(inbound_messages)),
+        "response_count": str(inbound_count),
     }
 
 
 # ── HubSpot helpers ───────────────────────────────────────────────────────────
 
-def hubspot_headers() -> dict:
-    return {
-        "Authorization": f"Bearer {HUBSPOT_ACCESS_TOKEN}",
-        "Content-Type": "application/json",
-    }
+def _upsert_batch(batch: list[dict]) -> dict:
+    """Upsert up to 100 leads keyed on email. Returns created/updated/errors/failed_batches counts."""
+    results = {"created": 0, "updated": 0, "errors": 0, "failed_batches": 0}
+    inputs = []
+    for lead in batch:
+        properties = {k: v for k, v in lead.items() if v}
+        inputs.append({
+            "idProperty": "email",
+            "id": lead["email"],
+            "properties": properties,
+        })
+
+    payload = {"inputs": inputs}
+
+    try:
+        HUBSPOT_LIMITER.acquire()
+        resp = hubspot_session.post(
+            f"{HUBSPOT_BASE_URL}/crm/v3/objects/contacts/batch/upsert",
+            data=orjson.dumps(payload),
+        )
+        hubspot_throttle(resp)
+        resp.raise_for_status()
+        data = orjson.loads(resp.content)
+
+        for result in data.get("results", []):
+            if result.get("new", False):
+                results["created"] += 1
+            else:
+                results["updated"] += 1
+
+    except requests.exceptions.HTTPError as e:
+        log.error(f"HubSpot batch upsert failed: {e}")
+        try:
+            log.error(f"Response: {resp.text[:500]}")
+        except Exception:
+            log.error("Could not read response body")
+        results["errors"] += len(batch)
+        results["failed_batches"] += 1
+    except Exception as e:
+        log.error(f"HubSpot batch upsert failed: {e}")
+        results["errors"] += len(batch)
+        results["failed_batches"] += 1
+
+    return results
+
+
+def _create_contact(lead: dict) -> dict:
+    """Create a single contact (no email to upsert on). Returns created/updated/errors counts."""
+    results = {"created": 0, "updated": 0, "errors": 0}
+    properties = {k: v for k, v in lead.items() if v}
+    try:
+        HUBSPOT_LIMITER.acquire()
+        resp = hubspot_create_session.post(
+            f"{HUBSPOT_BASE_URL}/crm/v3/objects/contacts",
+            data=orjson.dumps({"properties": properties}),
+        )
+        hubspot_throttle(resp)
+        if resp.status_code == 409:
+            results["updated"] += 1
+        else:
+            resp.raise_for_status()
+            results["created"] += 1
+    except requests.exceptions.HTTPError as e:
+        log.error(f"HubSpot create failed for {lead.get('linkedin', 'unknown')}: {resp.text[:300]}")
+        results["errors"] += 1
+    except Exception as e:
+        log.error(f"HubSpot create failed: {e}")
+        results["errors"] += 1
+    return results
 
 
 def batch_upsert_contacts(leads: list[dict]):
@@ -606,86 +960,39 @@ def batch_upsert_contacts(leads: list[dict]):
     Upsert contacts into HubSpot using the batch upsert API.
     Leads with email are upserted keyed on email.
     Leads without email are created individually.
+    Requests run concurrently, HUBSPOT_MAX_WORKERS at a time.
     """
+    results = {"created": 0, "updated": 0, "errors": 0, "failed_batches": 0}
     if not leads:
-        return {"created": 0, "updated": 0, "errors": 0}
-
-    results = {"created": 0, "updated": 0, "errors": 0}
+        return results
 
     # Split leads: those with email can use batch upsert, others need individual create
     leads_with_email = [l for l in leads if l.get("email")]
     leads_without_email = [l for l in leads if not l.get("email")]
 
-    # Batch upsert leads that have email (keyed on email)
-    for i in range(0, len(leads_with_email), 100):
-        batch = leads_with_email[i : i + 100]
-        inputs = []
-        for lead in batch:
-            properties = {k: v for k, v in lead.items() if v}
-            inputs.append({
-                "idProperty": "email",
-                "id": lead["email"],
-                "properties": properties,
-            })
+    with ThreadPoolExecutor(max_workers=HUBSPOT_MAX_WORKERS) as executor:
+        futures = [
+            executor.submit(_upsert_batch, leads_with_email[i : i + 100])
+            for i in range(0, len(leads_with_email), 100)
+        ]
+        futures += [executor.submit(_create_contact, lead) for lead in leads_without_email]
 
-        payload = {"inputs": inputs}
-
-        try:
-            resp = requests.post(
-                f"{HUBSPOT_BASE_URL}/crm/v3/objects/contacts/batch/upsert",
-                headers=hubspot_headers(),
-                json=payload,
-            )
-            resp.raise_for_status()
-            data = resp.json()
-
-            for result in data.get("results", []):
-                if result.get("new", False):
-                    results["created"] += 1
-                else:
-                    results["updated"] += 1
-
-        except requests.exceptions.HTTPError as e:
-            log.error(f"HubSpot batch upsert failed: {e}")
-            try:
-                log.error(f"Response: {resp.text[:500]}")
-            except Exception:
-                log.error("Could not read response body")
-            results["errors"] += len(batch)
-        except Exception as e:
-            log.error(f"HubSpot batch upsert failed: {e}")
-            results["errors"] += len(batch)
-
-        time.sleep(0.5)
-
-    # Create leads without email individually
-    for lead in leads_without_email:
-        properties = {k: v for k, v in lead.items() if v}
-        try:
-            resp = requests.post(
-                f"{HUBSPOT_BASE_URL}/crm/v3/objects/contacts",
-                headers=hubspot_headers(),
-                json={"properties": properties},
-            )
-            if resp.status_code == 409:
-                results["updated"] += 1
-            else:
-                resp.raise_for_status()
-                results["created"] += 1
-        except requests.exceptions.HTTPError as e:
-            log.error(f"HubSpot create failed for {lead.get('linkedin', 'unknown')}: {resp.text[:300]}")
-            results["errors"] += 1
-        except Exception as e:
-            log.error(f"HubSpot create failed: {e}")
-            results["errors"] += 1
-
-        time.sleep(0.1)
+        for future in futures:
+            for key, count in future.result().items():
+                results[key] += count
 
     return results
 
 
 # ── Main ──────────────────────────────────────────────────────────────────────
 
+def _lead_rank(lead: dict) -> tuple[bool, int]:
+    """Dedup preference: replied leads first, then the most recent response."""
+    if lead["has_responded"] != "true":
+        return (False, 0)
+    return (True, int(lead.get("latest_response_date") or 0))
+
+
 def main():
     parser = argparse.ArgumentParser(description="HeyReach → HubSpot sync")
     parser.add_argument("--limit", type=int, default=0,
@@ -695,6 +1002,7 @@ def main():
     args = parser.parse_args()
 
     log.info("=== HeyReach → HubSpot sync starting ===")
+    _parse_followup_date.cache_clear()
 
     # Validate env vars
     if not HEYREACH_API_KEY:
@@ -714,7 +1022,9 @@ def main():
 
     # 2. Get all campaigns
     try:
-        campaigns = get_all_campaigns()
+        if args.limit > 0:
+            log.info(f"Limiting to first {args.limit} campaigns")
+        campaigns = get_all_campaigns(args.limit)
     except Exception as e:
         log.error(f"Failed to fetch campaigns: {e}")
         return
@@ -724,55 +1034,60 @@ def main():
         save_last_run(now)
         return
 
-    if args.limit > 0:
-        log.info(f"Limiting to first {args.limit} campaigns (of {len(campaigns)})")
-        campaigns = campaigns[:args.limit]
-
     # 3. Process each campaign
     all_leads = []
     postponed_leads = []
     sector_cache = {}
     total_conversations = 0
     errors = []
+    failed_campaigns = 0
 
-    for campaign in campaigns:
+    # Campaigns are paged a few ahead while earlier ones are processed, in
+    # campaign order, so processing starts as soon as the first one lands.
+    for campaign, conversations_future in iter_campaign_conversations(campaigns, last_run):
         campaign_id = campaign.get("id") or campaign.get("campaignId")
         campaign_name = campaign.get("name", f"Campaign-{campaign_id}")
         log.info(f"Processing campaign: {campaign_name} (id={campaign_id})")
 
         try:
-            conversations = get_conversations_for_campaign(campaign_id)
+            conversations = conversations_future.result()
         except Exception as e:
             log.error(f"  Failed to fetch conversations for '{campaign_name}': {e}")
             errors.append(f"Campaign '{campaign_name}': {e}")
+            failed_campaigns += 1
             continue
 
         log.info(f"  Found {len(conversations)} conversations")
         total_conversations += len(conversations)
 
-        campaign_lead_count = 0
+        candidates = []
         for conv in conversations:
             # Filter by timestamp if incremental run
             if last_run:
-                latest_ts = conv.get("lastMessageAt", "")
-                if not latest_ts:
-                    conv_messages = conv.get("messages", [])
-                    for msg in conv_messages:
-                        ts = msg.get("createdAt", "")
-                        if ts and (not latest_ts or str(ts) > str(latest_ts)):
-                            latest_ts = ts
-
-                if latest_ts and str(latest_ts) < last_run:
+                latest_ts = conversation_last_activity(conv)
+                if latest_ts and latest_ts < last_run:
                     continue
 
-            if args.max_leads > 0 and campaign_lead_count >= args.max_leads:
-                break
+            candidates.append(conv)
+
+        if args.max_leads > 0:
+            candidates = candidates[:args.max_leads]
 
+        # Classify every reply in the campaign up front, a batch per OpenAI request.
+        replied = [
+            i for i, conv in enumerate(candidates)
+            if any(msg.get("sender") != "ME" for msg in conv.get("messages", []))
+        ]
+        sentiments = dict(zip(
+            replied,
+            classify_replies_sentiment([candidates[i].get("messages", []) for i in replied]),
+        ))
+
+        for i, conv in enumerate(candidates):
             try:
-                lead_data = extract_lead_data(conv, campaign_name, sector_cache)
+                lead_data = extract_lead_data(conv, campaign_name, sector_cache, sentiments.get(i))
                 if lead_data:
                     all_leads.append(lead_data)
-                    campaign_lead_count += 1
                     log.info(f"  Extracted lead: {lead_data['firstname']} {lead_data['lastname']} ({lead_data['linkedin']})")
 
                     # Track postponed leads for Slack
@@ -783,8 +1098,6 @@ def main():
                 log.error(f"  Failed to process conversation: {e}")
                 errors.append(f"Lead extraction error: {e}")
 
-        time.sleep(0.2)
-
     # Deduplicate leads by email — keep the entry with the most data
     seen = {}
     no_email = []
@@ -794,17 +1107,10 @@ def main():
             no_email.append(lead)
             continue
 
-        if key not in seen:
+        # Prefer the entry that has a reply; if both do, the later response
+        existing = seen.get(key)
+        if existing is None or _lead_rank(lead) > _lead_rank(existing):
             seen[key] = lead
-        else:
-            existing = seen[key]
-            # Prefer the entry that has a reply
-            if lead["has_responded"] == "true" and existing["has_responded"] != "true":
-                seen[key] = lead
-            # If both have replies, keep the one with the later response
-            elif (lead["has_responded"] == "true" and existing["has_responded"] == "true"
-                  and lead.get("latest_response_date", "") > existing.get("latest_response_date", "")):
-                seen[key] = lead
 
     all_leads = list(seen.values()) + no_email
     log.info(f"Total unique leads to sync: {len(all_leads)} ({len(seen)} with email, {len(no_email)} without)")
@@ -814,11 +1120,17 @@ def main():
         log.info("Upserting contacts into HubSpot...")
         results = batch_upsert_contacts(all_leads)
     else:
-        results = {"created": 0, "updated": 0, "errors": 0}
+        results = {"created": 0, "updated": 0, "errors": 0, "failed_batches": 0}
         log.info("No leads to sync")
 
-    # 5. Save state
-    save_last_run(now)
+    # 5. Save state — a campaign that couldn't be fetched or a batch HubSpot
+    #    didn't take would be filtered out of the next run, so keep the old
+    #    cutoff for those. Per-lead errors are logged below and don't hold it
+    #    back; a lead that always fails would otherwise force full re-syncs.
+    if failed_campaigns or results["failed_batches"]:
+        log.warning("Campaign fetch or HubSpot batch failed — keeping the previous last_run so it is retried")
+    else:
+        save_last_run(now)
 
     # 6. Summary
     log.info("=" * 60)
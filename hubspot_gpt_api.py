@@ -6,22 +6,45 @@ A unified API that allows a Custom GPT to query:
 - Gong call recordings (transcripts, stats, trackers, participants)
 - Semantic search across Gong transcripts via MongoDB Atlas vector search
 
-For production:
-    gunicorn hubspot_gpt_api:app --bind 0.0.0.0:$PORT
+For production (settings in gunicorn.conf.py):
+    gunicorn hubspot_gpt_api:app
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
+import atexit
+import functools
+import orjson
 import requests
 import os
-import json as json_module
-from datetime import datetime, timedelta
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from urllib.parse import quote
 import base64
 
+from cachetools import LRUCache, TTLCache
 from openai import OpenAI
 from pymongo import MongoClient
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import gong_ingest
+
+
+class ORJSONProvider(JSONProvider):
+    """Serve jsonify()/request.json through orjson; unknown types (ObjectId etc.) become str."""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
 CORS(app)
 
 # ============================================================================
@@ -47,29 +70,49 @@ if not GONG_API_KEY or not GONG_API_SECRET:
 # GONG CLIENT
 # ============================================================================
 
+# (connect, read) seconds; a stalled Gong socket must not pin a worker thread.
+GONG_TIMEOUT = (3.05, 30)
+
+# One pooled session for every Gong call: keep-alive connections are reused
+# across requests and the Basic Auth header is encoded once at import.
+GONG_SESSION = requests.Session()
+GONG_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=32,
+    # The Gong POSTs used here (/v2/calls/transcript) are read-only queries, so
+    # they are as safe to retry as GETs.
+    max_retries=Retry(
+        total=4,
+        backoff_factor=0.4,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET", "POST"],
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    ),
+))
+# Gong uses Basic Auth with API key as username and secret as password
+_gong_auth = base64.b64encode(f"{GONG_API_KEY}:{GONG_API_SECRET}".encode('ascii')).decode('ascii')
+GONG_SESSION.headers.update({
+    "Authorization": f"Basic {_gong_auth}",
+    "Content-Type": "application/json"
+})
+
+
 def gong_request(method, endpoint, json_data=None, params=None):
     """Make a request to Gong API with Basic Auth"""
-    # Gong uses Basic Auth with API key as username and secret as password
-    auth_string = f"{GONG_API_KEY}:{GONG_API_SECRET}"
-    auth_bytes = auth_string.encode('ascii')
-    base64_bytes = base64.b64encode(auth_bytes)
-    base64_auth = base64_bytes.decode('ascii')
-
-    headers = {
-        "Authorization": f"Basic {base64_auth}",
-        "Content-Type": "application/json"
-    }
-
     url = f"{GONG_BASE_URL}{endpoint}"
 
     try:
-        if method == "GET":
-            response = requests.get(url, headers=headers, params=params)
-        elif method == "POST":
-            response = requests.post(url, headers=headers, json=json_data)
+        response = GONG_SESSION.request(
+            method, url, json=json_data, params=params, timeout=GONG_TIMEOUT
+        )
 
         if response.status_code == 200:
-            return response.json()
+            return orjson.loads(response.content)
+        elif response.status_code == 429:
+            print(f"Gong API rate limited on {endpoint} after retries "
+                  f"(Retry-After: {response.headers.get('Retry-After', 'n/a')})")
+            return None
         else:
             print(f"Gong API Error: {response.status_code} - {response.text}")
             return None
@@ -78,6 +121,124 @@ def gong_request(method, endpoint, json_data=None, params=None):
         return None
 
 
+# Short-lived cache for GET /v2/calls. Several endpoints list calls over the
+# same day-aligned window, so repeated requests within the TTL reuse one fetch.
+GONG_CALLS_CACHE = TTLCache(maxsize=256, ttl=30)
+_gong_calls_cache_lock = threading.Lock()
+
+# Upper bound on /v2/calls pages (100 calls each) read when scanning a window
+# for one contact's calls, so a cache miss can't walk an unbounded listing.
+GONG_EMAIL_SCAN_MAX_PAGES = 10
+
+
+def _list_gong_calls(from_dt, to_dt, use_cache=True, limit=None, max_pages=None):
+    """GET /v2/calls for a date window, following Gong's cursor until `limit`
+    calls or `max_pages` pages.
+
+    Served from GONG_CALLS_CACHE when possible. Returns {"calls": [...]}, or
+    None if the first page fails.
+    """
+    key = (from_dt, to_dt, limit, max_pages)
+    if use_cache:
+        with _gong_calls_cache_lock:
+            cached = GONG_CALLS_CACHE.get(key)
+        if cached is not None:
+            return cached
+
+    params = {"fromDateTime": from_dt, "toDateTime": to_dt}
+    calls = []
+    pages = 0
+    while True:
+        page = gong_request("GET", "/v2/calls", params=params)
+        pages += 1
+        if page is None:
+            # Hand back what we have, but don't cache a truncated listing.
+            return {"calls": calls} if calls else None
+        calls.extend(page.get("calls", []))
+        cursor = page.get("records", {}).get("cursor")
+        if not cursor or (limit and len(calls) >= limit) or (max_pages and pages >= max_pages):
+            break
+        params["cursor"] = cursor
+
+    result = {"calls": calls[:limit] if limit else calls}
+    with _gong_calls_cache_lock:
+        GONG_CALLS_CACHE[key] = result
+    return result
+
+
+def _use_cache():
+    """Callers can bypass the Gong cache with ?no_cache=1."""
+    return request.args.get("no_cache") != "1"
+
+
+# (fresh, stale, lock) per route decorated with @cached_response.
+_RESPONSE_CACHES = []
+
+
+def cached_response(ttl):
+    """Cache a GET route's 200 responses by path + query string for `ttl` seconds.
+
+    The last good response is also kept past its TTL and served (marked with
+    X-Cache: stale) if a later call fails upstream.
+    """
+    def decorator(view):
+        fresh = TTLCache(maxsize=256, ttl=ttl)
+        stale = LRUCache(maxsize=256)
+        lock = threading.Lock()
+        _RESPONSE_CACHES.append((fresh, stale, lock))
+
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            query = sorted((k, v) for k, v in request.args.items(multi=True) if k != "no_cache")
+            key = (request.path, tuple(query))
+            if _use_cache():
+                with lock:
+                    body = fresh.get(key)
+                if body is not None:
+                    return app.response_class(body, mimetype="application/json")
+
+            response = app.make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                body = response.get_data()
+                with lock:
+                    fresh[key] = body
+                    stale[key] = body
+                return response
+
+            with lock:
+                body = stale.get(key)
+            if body is not None:
+                return app.response_class(body, mimetype="application/json", headers={"X-Cache": "stale"})
+            return response
+
+        return wrapper
+    return decorator
+
+
+@functools.lru_cache(maxsize=32)
+def _date_window(days, today):
+    """Gong (fromDateTime, toDateTime) strings for the last `days` days, formatted once per day."""
+    return f"{today - timedelta(days=days):%Y-%m-%d}T00:00:00Z", f"{today:%Y-%m-%d}T23:59:59Z"
+
+
+def _gong_calls_for_email(email, days=90, use_cache=True):
+    """Calls from the last `days` days with `email` as a participant; None if Gong failed.
+
+    Gong's call listing can't filter on external participants, so the
+    (cached) window is listed and filtered here.
+    """
+    from_dt, to_dt = _date_window(days, date.today())
+    result = _list_gong_calls(from_dt, to_dt, use_cache, max_pages=GONG_EMAIL_SCAN_MAX_PAGES)
+    if not result or "calls" not in result:
+        return None
+
+    target = email.casefold()
+    return [
+        call for call in result.get("calls", [])
+        if any((p.get("emailAddress") or "").casefold() == target for p in call.get("parties", []))
+    ]
+
+
 # ============================================================================
 # GONG API ENDPOINTS
 # ============================================================================
@@ -109,25 +270,25 @@ def search_gong_calls():
     """
     data = request.json or {}
 
-    # Default to last 7 days if no dates provided
-    to_date = data.get("to_date") or datetime.now().strftime("%Y-%m-%d")
-    from_date = data.get("from_date") or (datetime.now() - timedelta(days=7)).strftime("%Y-%m-%d")
+    limit = data.get("limit", 20)
+    if not isinstance(limit, int) or isinstance(limit, bool) or not 1 <= limit <= 100:
+        return jsonify({"error": "limit must be an integer between 1 and 100"}), 400
 
-    # Use query parameters for GET request
-    params = {
-        "fromDateTime": f"{from_date}T00:00:00Z",
-        "toDateTime": f"{to_date}T23:59:59Z"
-    }
+    # Default to last 7 days if no dates provided
+    now = datetime.now()
+    to_date = data.get("to_date") or now.strftime("%Y-%m-%d")
+    from_date = data.get("from_date") or (now - timedelta(days=7)).strftime("%Y-%m-%d")
 
-    result = gong_request("GET", "/v2/calls", params=params)
+    result = _list_gong_calls(
+        f"{from_date}T00:00:00Z", f"{to_date}T23:59:59Z", _use_cache(), limit=limit
+    )
 
     if not result or "calls" not in result:
         return jsonify({"message": "No calls found", "results": []})
 
     # Format calls for GPT
-    calls = []
-    for call in result.get("calls", [])[:data.get("limit", 20)]:
-        calls.append({
+    calls = [
+        {
             "call_id": call.get("id"),
             "title": call.get("title", "Untitled Call"),
             "started": call.get("started"),
@@ -136,7 +297,9 @@ def search_gong_calls():
             "participants": [p.get("emailAddress") for p in call.get("parties", [])],
             "direction": call.get("direction"),
             "system": call.get("system")
-        })
+        }
+        for call in result.get("calls", [])
+    ]
 
     return jsonify({
         "message": f"Found {len(calls)} calls from {from_date} to {to_date}",
@@ -144,70 +307,72 @@ def search_gong_calls():
     })
 
 
-@app.route("/gong/calls/<call_id>/transcript", methods=["GET"])
-def get_call_transcript(call_id: str):
-    """Get the full transcript of a Gong call"""
-    # Gong requires date range + call IDs
-    payload = {
-        "filter": {
-            "fromDateTime": (datetime.now() - timedelta(days=365)).strftime("%Y-%m-%dT00:00:00Z"),
-            "toDateTime": datetime.now().strftime("%Y-%m-%dT23:59:59Z"),
-            "callIds": [call_id]
-        }
+def _format_segment(segment):
+    """Flatten a Gong monologue (speaker + sentences array) into one text block."""
+    sentences = segment.get("sentences") or []
+    return {
+        "speaker_id": segment.get("speakerId"),
+        "topic": segment.get("topic", ""),
+        "text": " ".join([s.get("text", "") for s in sentences]),
+        "start_time": sentences[0].get("start") if sentences else None,
+        "end_time": sentences[-1].get("end") if sentences else None
     }
 
-    result = gong_request("POST", "/v2/calls/transcript", json_data=payload)
 
-    if not result or not result.get("callTranscripts"):
-        return jsonify({"error": "Call transcript not found"}), 404
+# Raw transcript segments by call ID. A processed call's transcript doesn't
+# change, and GPT clients often re-read the same call while summarising it;
+# entries can be several MB, so only a handful are kept.
+TRANSCRIPT_CACHE = TTLCache(maxsize=64, ttl=3600)
+_transcript_cache_lock = threading.Lock()
 
-    # Get the first (and should be only) transcript
-    call_transcript_data = result.get("callTranscripts", [])[0]
-    transcript_segments = call_transcript_data.get("transcript", [])
 
-    formatted_transcript = []
+def _stream_transcript(call_id, segments, chunk_size=200):
+    """Yield {"call_id": ..., "transcript": [...]} as JSON, a few hundred segments at a time.
 
-    for segment in transcript_segments:
-        # Each segment is a monologue with a sentences array containing the actual text
-        sentences = segment.get("sentences", [])
-        full_text = " ".join(s.get("text", "") for s in sentences)
-        start_time = sentences[0].get("start") if sentences else None
-        end_time = sentences[-1].get("end") if sentences else None
+    Long calls have thousands of segments; streaming sends bytes as they are
+    formatted instead of holding the full list and its serialized copy.
+    """
+    yield b'{"call_id":' + orjson.dumps(call_id) + b',"transcript":['
+    for i in range(0, len(segments), chunk_size):
+        chunk = b",".join([orjson.dumps(_format_segment(s)) for s in segments[i:i + chunk_size]])
+        yield (b"," + chunk) if i else chunk
+    yield b"]}"
 
-        formatted_transcript.append({
-            "speaker_id": segment.get("speakerId"),
-            "topic": segment.get("topic", ""),
-            "text": full_text,
-            "start_time": start_time,
-            "end_time": end_time
-        })
 
-    return jsonify({
-        "call_id": call_id,
-        "transcript": formatted_transcript
-    })
+@app.route("/gong/calls/<call_id>/transcript", methods=["GET"])
+def get_call_transcript(call_id: str):
+    """Get the full transcript of a Gong call"""
+    transcript_segments = None
+    if _use_cache():
+        with _transcript_cache_lock:
+            transcript_segments = TRANSCRIPT_CACHE.get(call_id)
 
-@app.route("/gong/calls/<call_id>/stats", methods=["GET"])
-def get_call_stats(call_id: str):
-    """Get call statistics including talk ratio and trackers"""
-    # First get basic call info
-    params = {
-        "fromDateTime": (datetime.now() - timedelta(days=365)).strftime("%Y-%m-%dT00:00:00Z"),
-        "toDateTime": datetime.now().strftime("%Y-%m-%dT23:59:59Z")
-    }
+    if transcript_segments is None:
+        # Filtering by call ID alone lets Gong look the call up directly, with no
+        # date window to scan (and no cutoff for calls older than a year).
+        payload = {"filter": {"callIds": [call_id]}}
 
-    result = gong_request("GET", "/v2/calls", params=params)
+        result = gong_request("POST", "/v2/calls/transcript", json_data=payload)
 
-    if not result or "calls" not in result:
-        return jsonify({"error": "Call not found"}), 404
+        if not result or not result.get("callTranscripts"):
+            return jsonify({"error": "Call transcript not found"}), 404
 
-    # Find the specific call
-    call_data = None
-    for call in result.get("calls", []):
-        if call.get("id") == call_id:
-            call_data = call
-            break
+        # Get the first (and should be only) transcript
+        call_transcript_data = result.get("callTranscripts", [])[0]
+        transcript_segments = call_transcript_data.get("transcript", [])
+        with _transcript_cache_lock:
+            TRANSCRIPT_CACHE[call_id] = transcript_segments
+
+    return Response(_stream_transcript(call_id, transcript_segments), mimetype="application/json")
+
+@app.route("/gong/calls/<call_id>/stats", methods=["GET"])
+@cached_response(ttl=60)
+def get_call_stats(call_id: str):
+    """Get call statistics including talk ratio and trackers"""
+    # Fetch the one call directly rather than scanning a year of call listings
+    result = gong_request("GET", f"/v2/calls/{quote(call_id, safe='')}")
 
+    call_data = result.get("call") if result else None
     if not call_data:
         return jsonify({"error": "Call not found"}), 404
 
@@ -223,31 +388,25 @@ def get_call_stats(call_id: str):
 
 
 @app.route("/gong/contacts/<email>/calls", methods=["GET"])
+@cached_response(ttl=30)
 def get_contact_calls(email: str):
     """Get all Gong calls for a specific contact email"""
-    # Search calls in the last 90 days
-    params = {
-        "fromDateTime": (datetime.now() - timedelta(days=90)).strftime("%Y-%m-%dT00:00:00Z"),
-        "toDateTime": datetime.now().strftime("%Y-%m-%dT23:59:59Z")
-    }
+    matches = _gong_calls_for_email(email, days=90, use_cache=_use_cache())
 
-    result = gong_request("GET", "/v2/calls", params=params)
+    if matches is None:
+        # An error status lets @cached_response fall back to the last good answer.
+        return jsonify({"error": "Failed to fetch calls from Gong"}), 502
 
-    if not result or "calls" not in result:
-        return jsonify({"message": f"No calls found for {email}", "results": []})
-
-    # Filter calls where this email is a participant
-    calls = []
-    for call in result.get("calls", []):
-        participants = [p.get("emailAddress") for p in call.get("parties", [])]
-        if email.lower() in [p.lower() for p in participants if p]:
-            calls.append({
-                "call_id": call.get("id"),
-                "title": call.get("title"),
-                "date": call.get("started"),
-                "duration_seconds": call.get("duration"),
-                "url": call.get("url")
-            })
+    calls = [
+        {
+            "call_id": call.get("id"),
+            "title": call.get("title"),
+            "date": call.get("started"),
+            "duration_seconds": call.get("duration"),
+            "url": call.get("url")
+        }
+        for call in matches
+    ]
 
     return jsonify({
         "email": email,
@@ -256,23 +415,67 @@ def get_contact_calls(email: str):
     })
 
 
+@app.route("/cache/flush", methods=["POST"])
+def flush_cache():
+    """Drop all cached Gong call lists, transcripts, route responses and vector search results"""
+    with _gong_calls_cache_lock:
+        flushed = len(GONG_CALLS_CACHE)
+        GONG_CALLS_CACHE.clear()
+    with _transcript_cache_lock:
+        flushed += len(TRANSCRIPT_CACHE)
+        TRANSCRIPT_CACHE.clear()
+    with _search_results_cache_lock:
+        flushed += len(SEARCH_RESULTS_CACHE)
+        SEARCH_RESULTS_CACHE.clear()
+    for fresh, stale, lock in _RESPONSE_CACHES:
+        with lock:
+            flushed += len(fresh)
+            fresh.clear()
+            stale.clear()
+    return jsonify({"message": "Cache flushed", "entries_flushed": flushed})
+
+
 # ============================================================================
 # GONG VECTOR SEARCH ENDPOINTS
 # ============================================================================
 
 
+# One MongoClient per process: it is thread-safe and pools its own connections.
+# Created on first use so each gunicorn worker builds its own after fork.
+_mongo_client = None
+_mongo_client_lock = threading.Lock()
+
+
 def get_mongo_collection():
     """Get the MongoDB collection for transcript chunks."""
-    client = MongoClient(MONGODB_URI)
-    db = client["gong"]
-    return client, db["gong_transcripts"]
+    global _mongo_client
+    with _mongo_client_lock:
+        if _mongo_client is None:
+            _mongo_client = MongoClient(MONGODB_URI, maxPoolSize=50)
+            atexit.register(_mongo_client.close)
+    return _mongo_client["gong"]["gong_transcripts"]
+
+
+# Reused across requests so the HTTP connection pool to OpenAI stays warm.
+_openai_client = OpenAI(api_key=OPENAI_API_KEY) if OPENAI_API_KEY else None
+
+
+@functools.lru_cache(maxsize=1024)
+def _cached_embedding(text):
+    response = _openai_client.embeddings.create(model="text-embedding-3-small", input=text)
+    return tuple(response.data[0].embedding)
 
 
 def embed_query(text):
-    """Embed a query string using OpenAI."""
-    client = OpenAI(api_key=OPENAI_API_KEY)
-    response = client.embeddings.create(model="text-embedding-3-small", input=text)
-    return response.data[0].embedding
+    """Embed a query string using OpenAI; repeated queries are served from memory."""
+    return list(_cached_embedding(text))
+
+
+# Search responses keyed by normalised query text + filters. GPT clients often
+# re-issue the same search within a conversation; a hit skips both the OpenAI
+# embedding and the Atlas $vectorSearch. Cleared by POST /cache/flush.
+SEARCH_RESULTS_CACHE = TTLCache(maxsize=512, ttl=600)
+_search_results_cache_lock = threading.Lock()
 
 
 @app.route("/gong/search", methods=["POST"])
@@ -298,15 +501,35 @@ def gong_vector_search():
         return jsonify({"error": "MONGODB_URI and OPENAI_API_KEY must be configured"}), 500
 
     limit = data.get("limit", 20)
+    from_date = data.get("from_date")
+    to_date = data.get("to_date")
+
+    # Reject bad input before paying for an embedding.
+    if not isinstance(limit, int) or isinstance(limit, bool) or not 1 <= limit <= 100:
+        return jsonify({"error": "limit must be an integer between 1 and 100"}), 400
+
+    date_match = {}
+    try:
+        if from_date:
+            date_match["$gte"] = datetime.fromisoformat(from_date)
+        if to_date:
+            date_match["$lte"] = datetime.fromisoformat(to_date + "T23:59:59")
+    except (TypeError, ValueError):
+        return jsonify({"error": "from_date and to_date must be YYYY-MM-DD"}), 400
+
+    cache_key = (" ".join(query.casefold().split()), from_date, to_date, limit)
+    if _use_cache():
+        with _search_results_cache_lock:
+            cached = SEARCH_RESULTS_CACHE.get(cache_key)
+        if cached is not None:
+            return jsonify(cached)
 
     # Embed the query
     query_embedding = embed_query(query)
 
     # Build vector search pipeline
     # Fetch more candidates if date filtering will be applied post-search
-    from_date = data.get("from_date")
-    to_date = data.get("to_date")
-    fetch_limit = limit * 3 if (from_date or to_date) else limit
+    fetch_limit = limit * 3 if date_match else limit
 
     vector_search_stage = {
         "$vectorSearch": {
@@ -338,43 +561,35 @@ def gong_vector_search():
     ]
 
     # Apply date filter after vector search (not inside $vectorSearch)
-    if from_date or to_date:
-        date_match = {}
-        if from_date:
-            date_match["$gte"] = datetime.fromisoformat(from_date)
-        if to_date:
-            date_match["$lte"] = datetime.fromisoformat(to_date + "T23:59:59")
+    if date_match:
         pipeline.append({"$match": {"call_date": date_match}})
 
     pipeline.append({"$limit": limit})
 
-    mongo_client, collection = get_mongo_collection()
+    collection = get_mongo_collection()
 
-    try:
-        results = list(collection.aggregate(pipeline))
-    except Exception as e:
-        mongo_client.close()
-        return jsonify({"error": f"Vector search failed: {str(e)}"}), 500
-
-    # Format results
     matching_calls = []
     seen_call_ids = set()
 
-    for r in results:
-        r["_id"] = str(r["_id"])
-        if r.get("call_date"):
-            r["call_date"] = r["call_date"].isoformat()
-        matching_calls.append(r)
-        seen_call_ids.add(r.get("call_id"))
-
-    mongo_client.close()
+    try:
+        # Walk the cursor directly; documents arrive in batches sized to the request.
+        # ObjectId and datetime fields are serialized by ORJSONProvider.
+        for r in collection.aggregate(pipeline, batchSize=min(limit, 100)):
+            matching_calls.append(r)
+            seen_call_ids.add(r.get("call_id"))
+    except Exception as e:
+        return jsonify({"error": f"Vector search failed: {str(e)}"}), 500
 
-    return jsonify({
+    response = {
         "query": query,
         "matching_chunks": len(matching_calls),
         "unique_calls": len(seen_call_ids),
         "results": matching_calls,
-    })
+    }
+    with _search_results_cache_lock:
+        SEARCH_RESULTS_CACHE[cache_key] = response
+
+    return jsonify(response)
 
 
 @app.route("/gong/ingest", methods=["POST"])
@@ -387,13 +602,11 @@ def trigger_gong_ingest():
         "days_back": 90  // Optional, defaults to 90
     }
     """
-    from gong_ingest import ingest_calls
-
     data = request.json or {}
     days_back = data.get("days_back", 90)
 
     try:
-        count = ingest_calls(days_back=days_back)
+        count = gong_ingest.ingest_calls(days_back=days_back)
         return jsonify({"message": f"Ingested {count} new calls", "calls_ingested": count})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -410,8 +623,6 @@ def gong_webhook():
     Register this URL in Gong: Settings > API > Webhooks
     Event type: CALL_ANALYZED
     """
-    from gong_ingest import ingest_single_call
-
     data = request.json or {}
 
     # Handle Gong webhook verification (ping)
@@ -423,7 +634,7 @@ def gong_webhook():
         return jsonify({"error": "No callId in webhook payload"}), 400
 
     try:
-        ingested = ingest_single_call(call_id)
+        ingested = gong_ingest.ingest_single_call(call_id)
         if ingested:
             return jsonify({"message": f"Call {call_id} ingested successfully"})
         else:
@@ -433,6 +644,46 @@ def gong_webhook():
         return jsonify({"error": str(e)}), 500
 
 
+# ============================================================================
+# BATCH ENDPOINT
+# ============================================================================
+
+BATCH_MAX_PATHS = 10
+
+
+def _run_subrequest(path):
+    """GET one API path in-process and return its status and JSON body."""
+    with app.test_client() as client:
+        resp = client.get(path)
+        return {"status": resp.status_code, "body": resp.get_json(silent=True)}
+
+
+@app.route("/batch", methods=["POST"])
+def batch():
+    """
+    Run several GET endpoints in one round-trip, concurrently.
+
+    Request body:
+    {
+        "paths": ["/gong/calls/123/stats", "/gong/contacts/a@b.com/calls"]
+    }
+    """
+    data = request.json or {}
+    paths = list(dict.fromkeys(data.get("paths") or []))
+
+    if not paths or not all(isinstance(p, str) and p.startswith("/") for p in paths):
+        return jsonify({"error": "Provide 'paths' as a list of API paths starting with '/'"}), 400
+    if len(paths) > BATCH_MAX_PATHS:
+        return jsonify({"error": f"At most {BATCH_MAX_PATHS} paths per batch"}), 400
+    if any(p.split("?")[0].rstrip("/") == "/batch" for p in paths):
+        return jsonify({"error": "Batches cannot be nested"}), 400
+
+    with ThreadPoolExecutor(max_workers=len(paths)) as executor:
+        results = dict(zip(paths, executor.map(_run_subrequest, paths)))
+
+    return jsonify({"results": results})
+
+
 # ============================================================================
 # MCP SERVER (for Claude.ai integration)
 # ============================================================================
@@ -547,7 +798,7 @@ def handle_mcp():
                 "jsonrpc": "2.0",
                 "id": req_id,
                 "result": {
-                    "content": [{"type": "text", "text": json_module.dumps(result, default=str)}],
+                    "content": [{"type": "text", "text": app.json.dumps(result)}],
                 },
             })
         except Exception as e:
@@ -555,7 +806,7 @@ def handle_mcp():
                 "jsonrpc": "2.0",
                 "id": req_id,
                 "result": {
-                    "content": [{"type": "text", "text": json_module.dumps({"error": str(e)})}],
+                    "content": [{"type": "text", "text": app.json.dumps({"error": str(e)})}],
                     "isError": True,
                 },
             })
@@ -584,15 +835,18 @@ if __name__ == "__main__":
 ║    GET  /gong/calls/<id>/transcript  - Get transcript        ║
 ║    GET  /gong/calls/<id>/stats       - Get stats             ║
 ║    GET  /gong/contacts/<email>/calls - Contact's calls       ║
+║    POST /cache/flush                 - Flush caches          ║
 ║    POST /gong/search                 - Vector search         ║
 ║    POST /gong/ingest                 - Trigger ingestion     ║
 ║    POST /gong/webhook                - Gong webhook          ║
+║    POST /batch                       - Several GETs at once  ║
 ║                                                               ║
 ║  MCP:                                                        ║
 ║    POST /mcp                         - MCP endpoint          ║
 ╚══════════════════════════════════════════════════════════════╝
 
-Running on http://localhost:{port}
+Running on http://localhost:{port} (development server)
+For production: gunicorn hubspot_gpt_api:app
     """)
 
     app.run(host="0.0.0.0", port=port, debug=debug)
@@ -14,19 +14,29 @@ Setup:
     HUBSPOT_ACCESS_TOKEN=your_hubspot_access_token
     OPENAI_API_KEY=your_openai_api_key (optional — falls back to keywords)
     SLACK_TOFU_REPLIES_WEBHOOK_URL=your_slack_webhook (optional)
+    INSTANTLY_RATE_LIMIT=10 / INSTANTLY_RATE_PERIOD=1 (optional — requests per seconds)
 
   Run: python instantly_to_hubspot.py
 """
 
 import argparse
+import functools
 import os
 import json
 import logging
 import re
+import sqlite3
+import threading
 import time
+import orjson
 import requests
-from datetime import datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from resilience import RateLimiter
 
 load_dotenv()
 
@@ -41,6 +51,36 @@ INSTANTLY_BASE_URL = "https://api.instantly.ai/api/v2"
 HUBSPOT_BASE_URL = "https://api.hubapi.com"
 
 STATE_FILE = "instantly_hubspot_last_run.json"
+# Re-check leads updated shortly before the last run started.
+SYNC_OVERLAP = timedelta(minutes=15)
+# Properties describing a lead's reply. An incremental run only sees the
+# campaigns a lead was updated in, so these are left alone when it has no reply.
+REPLY_PROPERTIES = ("has_responded", "reply_sentiment", "taken_off_list", "is_postponed",
+                    "sentiment_notes", "response_count")
+LEAD_CACHE_FILE = "instantly_lead_cache.sqlite3"
+SECTOR_CACHE_FILE = "instantly_hubspot_sector_cache.json"
+SECTOR_CACHE_VERSION = 1
+# Re-classify campaigns periodically in case they were renamed or re-targeted.
+SECTOR_CACHE_TTL = timedelta(days=90)
+
+# Campaigns processed at the same time; they share the Instantly rate limit.
+CAMPAIGN_MAX_WORKERS = 4
+# Leads whose emails are fetched from Instantly at the same time.
+INSTANTLY_MAX_WORKERS = 8
+# Rough emails sent per lead (sequence steps), used to estimate how many
+# 100-email pages a campaign-wide email pull takes. The bulk pull is used only
+# when that beats the two or more requests per lead of fetching individually.
+BULK_EMAIL_SENT_PER_LEAD = 3
+# Concurrent HubSpot upsert batches; HUBSPOT_LIMITER keeps them to 10 req/s.
+HUBSPOT_MAX_WORKERS = 10
+# Concurrent OpenAI sentiment requests across all campaigns; keep under the OpenAI account's RPM.
+OPENAI_MAX_WORKERS = 16
+# Instantly requests allowed per period, shared by every campaign, lead and
+# email thread. The default matches the old sequential pacing (one request
+# plus a 0.1-0.2s pause, so at most ~10/s); set these to the workspace's
+# Instantly API quota to go faster, or lower them if it returns 429s.
+INSTANTLY_RATE_LIMIT = int(os.getenv("INSTANTLY_RATE_LIMIT", "10"))
+INSTANTLY_RATE_PERIOD = float(os.getenv("INSTANTLY_RATE_PERIOD", "1"))
 
 logging.basicConfig(
     level=logging.INFO,
@@ -59,30 +99,163 @@ if OPENAI_API_KEY:
         log.warning("openai package not installed — falling back to keyword classification")
 
 
+# ── HTTP sessions ─────────────────────────────────────────────────────────────
+
+def _make_session() -> requests.Session:
+    """Session with keep-alive pooling and backoff on 429/5xx/connection errors."""
+    session = requests.Session()
+    retry = Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["GET", "POST"],
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry))
+    return session
+
+
+# Each service gets its own session so API credentials never leak to another host.
+instantly_session = _make_session()
+instantly_session.headers.update({
+    "Authorization": f"Bearer {INSTANTLY_API_KEY}",
+    "Content-Type": "application/json",
+})
+hubspot_session = _make_session()
+hubspot_session.headers.update({
+    "Authorization": f"Bearer {HUBSPOT_ACCESS_TOKEN}",
+    "Content-Type": "application/json",
+})
+slack_session = _make_session()
+
+
+# ── Rate limiting ─────────────────────────────────────────────────────────────
+
+INSTANTLY_LIMITER = RateLimiter(INSTANTLY_RATE_LIMIT, INSTANTLY_RATE_PERIOD)
+# HubSpot private apps get 10 requests per second (burst included).
+HUBSPOT_LIMITER = RateLimiter(10, 1)
+
+
+def hubspot_throttle(resp: requests.Response):
+    """Pause for the rest of HubSpot's one-second window once its budget is spent."""
+    if resp.headers.get("X-HubSpot-RateLimit-Secondly-Remaining") == "0":
+        time.sleep(1)
+
+
 # ── State helpers ─────────────────────────────────────────────────────────────
 
 def load_last_run() -> str | None:
-    if os.path.exists(STATE_FILE):
+    """Return the ISO timestamp of the last successful run, or None for first run."""
+    try:
         with open(STATE_FILE) as f:
-            data = json.load(f)
-            return data.get("last_run")
-    return None
+            return json.load(f).get("last_run")
+    except FileNotFoundError:
+        return None
 
 
 def save_last_run(ts: datetime):
-    with open(STATE_FILE, "w") as f:
-        json.dump({"last_run": ts.isoformat()}, f)
+    # Write-then-rename so a crash mid-write can't leave a truncated state file.
+    tmp = STATE_FILE + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(orjson.dumps({"last_run": ts.isoformat()}))
+    os.replace(tmp, STATE_FILE)
 
 
-# ── Instantly helpers ─────────────────────────────────────────────────────────
-
-def instantly_headers() -> dict:
+def load_sector_cache(now: datetime) -> dict[str, dict]:
+    """Return unexpired {campaign_name: {"sector", "classified_at"}} entries from disk."""
+    try:
+        with open(SECTOR_CACHE_FILE) as f:
+            data = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+    if data.get("version") != SECTOR_CACHE_VERSION:
+        return {}
+    cutoff = (now - SECTOR_CACHE_TTL).isoformat()
     return {
-        "Authorization": f"Bearer {INSTANTLY_API_KEY}",
-        "Content-Type": "application/json",
+        name: entry for name, entry in data.get("sectors", {}).items()
+        if entry.get("classified_at", "") >= cutoff
     }
 
 
+def save_sector_cache(entries: dict[str, dict]):
+    tmp = SECTOR_CACHE_FILE + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(orjson.dumps({"version": SECTOR_CACHE_VERSION, "sectors": entries}))
+    os.replace(tmp, SECTOR_CACHE_FILE)
+
+
+def _updated_before(lead: dict, since: datetime) -> bool:
+    """True if Instantly reports the lead as last updated before `since`."""
+    ts = lead.get("timestamp_updated")
+    if not ts:
+        return False
+    try:
+        updated = datetime.fromisoformat(ts.replace("Z", "+00:00"))
+    except (ValueError, TypeError, AttributeError):
+        return False
+    if updated.tzinfo is None:
+        updated = updated.replace(tzinfo=timezone.utc)
+    return updated < since
+
+
+# ── Lead cache ────────────────────────────────────────────────────────────────
+# Emails and sentiment for a replied lead are persisted across runs. Each
+# (email, campaign) keeps one row, stamped with a fingerprint of the lead's
+# reply count, last-reply and last-contact times: a new reply or follow-up
+# changes the fingerprint, so the row is refetched and overwritten in place.
+
+_lead_cache_conn = None
+_lead_cache_lock = threading.Lock()
+
+
+def _lead_cache_db() -> sqlite3.Connection:
+    global _lead_cache_conn
+    if _lead_cache_conn is None:
+        _lead_cache_conn = sqlite3.connect(LEAD_CACHE_FILE, check_same_thread=False)
+        # Earlier layout: one row per fingerprint, never pruned.
+        _lead_cache_conn.execute("DROP TABLE IF EXISTS leads")
+        _lead_cache_conn.execute(
+            "CREATE TABLE IF NOT EXISTS lead_threads (lead TEXT PRIMARY KEY, fingerprint TEXT, value TEXT)"
+        )
+    return _lead_cache_conn
+
+
+def lead_cache_key(lead: dict, campaign_id: str) -> tuple[str, str]:
+    """(lead id, fingerprint) for a lead in a campaign."""
+    return (
+        f"{lead.get('email', '')}|{campaign_id}",
+        "|".join((
+            str(lead.get("email_reply_count", 0) or 0),
+            lead.get("timestamp_last_reply") or "",
+            lead.get("timestamp_last_contact") or "",
+        )),
+    )
+
+
+def lead_cache_get(key: tuple[str, str]) -> dict | None:
+    """Return the cached {"emails", "sentiment"} for a lead if its fingerprint still matches."""
+    with _lead_cache_lock:
+        row = _lead_cache_db().execute(
+            "SELECT value FROM lead_threads WHERE lead = ? AND fingerprint = ?", key
+        ).fetchone()
+    return json.loads(row[0]) if row else None
+
+
+def lead_cache_set_many(entries: dict[tuple[str, str], dict]):
+    if not entries:
+        return
+    with _lead_cache_lock:
+        db = _lead_cache_db()
+        db.executemany(
+            "INSERT OR REPLACE INTO lead_threads (lead, fingerprint, value) VALUES (?, ?, ?)",
+            [(lead, fingerprint, json.dumps(value)) for (lead, fingerprint), value in entries.items()],
+        )
+        db.commit()
+
+
+# ── Instantly helpers ─────────────────────────────────────────────────────────
+
 def get_all_campaigns() -> list[dict]:
     """Fetch all Instantly campaigns with cursor pagination."""
     campaigns = []
@@ -93,13 +266,10 @@ def get_all_campaigns() -> list[dict]:
         if starting_after:
             params["starting_after"] = starting_after
 
-        resp = requests.get(
-            f"{INSTANTLY_BASE_URL}/campaigns",
-            headers=instantly_headers(),
-            params=params,
-        )
+        INSTANTLY_LIMITER.acquire()
+        resp = instantly_session.get(f"{INSTANTLY_BASE_URL}/campaigns", params=params)
         resp.raise_for_status()
-        data = resp.json()
+        data = orjson.loads(resp.content)
 
         items = data if isinstance(data, list) else data.get("items", data.get("data", []))
         if not items:
@@ -118,15 +288,22 @@ def get_all_campaigns() -> list[dict]:
             break
 
         starting_after = next_cursor
-        time.sleep(0.2)
 
     log.info(f"Found {len(campaigns)} Instantly campaigns")
     return campaigns
 
 
-def get_leads_for_campaign(campaign_id: str, max_leads: int = 0) -> list[dict]:
-    """Fetch leads for a campaign with cursor pagination."""
+def get_leads_for_campaign(
+    campaign_id: str, max_leads: int = 0, updated_since: datetime | None = None
+) -> tuple[list[dict], int | None]:
+    """Fetch leads for a campaign with cursor pagination.
+
+    With `updated_since`, leads Instantly last updated before it are dropped.
+    Returns (leads, campaign size before that filter); the size is None when
+    `max_leads` stopped paging early.
+    """
     leads = []
+    campaign_size = 0
     starting_after = None
 
     while True:
@@ -137,23 +314,23 @@ def get_leads_for_campaign(campaign_id: str, max_leads: int = 0) -> list[dict]:
         if starting_after:
             payload["starting_after"] = starting_after
 
-        resp = requests.post(
-            f"{INSTANTLY_BASE_URL}/leads/list",
-            headers=instantly_headers(),
-            json=payload,
-        )
+        INSTANTLY_LIMITER.acquire()
+        resp = instantly_session.post(f"{INSTANTLY_BASE_URL}/leads/list", data=orjson.dumps(payload))
         resp.raise_for_status()
-        data = resp.json()
+        data = orjson.loads(resp.content)
 
         items = data if isinstance(data, list) else data.get("items", data.get("data", []))
         if not items:
             break
 
-        leads.extend(items)
+        campaign_size += len(items)
+        if updated_since:
+            leads.extend(item for item in items if not _updated_before(item, updated_since))
+        else:
+            leads.extend(items)
 
         if max_leads > 0 and len(leads) >= max_leads:
-            leads = leads[:max_leads]
-            break
+            return leads[:max_leads], None
 
         # Cursor pagination
         next_cursor = None
@@ -166,9 +343,8 @@ def get_leads_for_campaign(campaign_id: str, max_leads: int = 0) -> list[dict]:
             break
 
         starting_after = next_cursor
-        time.sleep(0.2)
 
-    return leads
+    return leads, campaign_size
 
 
 def get_emails_for_lead(lead_email: str, campaign_id: str) -> list[dict]:
@@ -187,13 +363,10 @@ def get_emails_for_lead(lead_email: str, campaign_id: str) -> list[dict]:
             if starting_after:
                 params["starting_after"] = starting_after
 
-            resp = requests.get(
-                f"{INSTANTLY_BASE_URL}/emails",
-                headers=instantly_headers(),
-                params=params,
-            )
+            INSTANTLY_LIMITER.acquire()
+            resp = instantly_session.get(f"{INSTANTLY_BASE_URL}/emails", params=params)
             resp.raise_for_status()
-            data = resp.json()
+            data = orjson.loads(resp.content)
 
             items = data if isinstance(data, list) else data.get("items", data.get("data", []))
             if not items:
@@ -210,38 +383,119 @@ def get_emails_for_lead(lead_email: str, campaign_id: str) -> list[dict]:
                 break
 
             starting_after = next_cursor
-            time.sleep(0.1)
 
     return emails
 
 
+def get_emails_for_campaign(campaign_id: str, lead_emails: set[str]) -> dict[str, list[dict]]:
+    """Fetch a campaign's emails in one paginated pass, grouped by (lowercased) lead email.
+
+    Only emails for `lead_emails` are kept; every lead in it gets an entry.
+    """
+    wanted = {e.lower() for e in lead_emails}
+    by_lead = {e: [] for e in wanted}
+
+    for email_type in ["sent", "received"]:
+        starting_after = None
+        while True:
+            params = {"campaign_id": campaign_id, "email_type": email_type, "limit": 100}
+            if starting_after:
+                params["starting_after"] = starting_after
+
+            INSTANTLY_LIMITER.acquire()
+            resp = instantly_session.get(f"{INSTANTLY_BASE_URL}/emails", params=params)
+            resp.raise_for_status()
+            data = orjson.loads(resp.content)
+
+            items = data if isinstance(data, list) else data.get("items", data.get("data", []))
+            if not items:
+                break
+
+            for item in items:
+                lead = (item.get("lead") or "").lower()
+                if lead in wanted:
+                    item["_email_type"] = email_type
+                    by_lead[lead].append(item)
+
+            next_cursor = None
+            if isinstance(data, dict):
+                next_cursor = data.get("next_starting_after")
+            if not next_cursor or len(items) < 100:
+                break
+
+            starting_after = next_cursor
+
+    return by_lead
+
+
 # ── OpenAI classification ─────────────────────────────────────────────────────
 
-def openai_classify_sentiment(messages: list[dict]) -> dict | None:
-    if not openai_client:
-        return None
+SENTIMENT_FIELDS = """- "reply_sentiment": one of "Enthusiastic", "Positive", "Neutral", "Negative", "Postponed", "Not Yet Responded"
+- "taken_off_list": "yes" or "no" — is the lead asking to be removed, opting out, unsubscribing, saying "not interested", "remove me", "stop contacting", etc.?
+- "is_postponed": "true" or "false" — is the lead saying "not right now", "reach out later", "busy right now", "maybe next quarter", etc.?
+- "sentiment_notes": brief 1-2 sentence explanation of your classification"""
+
+# Conversations classified per OpenAI request by openai_classify_sentiment_batch.
+SENTIMENT_BATCH_SIZE = 20
+
+
+# Per-message cap on text sent to OpenAI, after quoted history is removed.
+SENTIMENT_MAX_CHARS = 1500
+
+# Start of quoted history: an "On <date>, <name> wrote:" header (on one line,
+# or wrapped onto two) or a "> " quoted line. A header never spans more than
+# two lines, so a reply that itself opens with "On ..." keeps its text.
+_QUOTED_RE = re.compile(r"^(?:On\s[^\n]{0,300}?(?:\n[^\n]{0,300}?)?\swrote:|>)", re.M)
+
+
+def _strip_quoted(text: str) -> str:
+    """Drop quoted earlier messages from an email body and cap its length."""
+    match = _QUOTED_RE.search(text)
+    if match:
+        text = text[:match.start()]
+    return text.strip()[:SENTIMENT_MAX_CHARS]
+
+
+def _email_ts(e: dict) -> str:
+    return e.get("timestamp_email", e.get("timestamp_created", "")) or ""
 
-    conversation_text = ""
+
+def _conversation_text(messages: list[dict]) -> str:
+    """Latest outbound email and latest reply, oldest first, without quoted history."""
+    latest = {}
     for msg in messages:
-        direction = msg.get("_email_type", "sent").upper()
-        if direction == "SENT":
-            direction = "OUTBOUND"
-        else:
-            direction = "INBOUND"
+        direction = "OUTBOUND" if msg.get("_email_type", "sent") == "sent" else "INBOUND"
+        if direction not in latest or _email_ts(msg) > _email_ts(latest[direction]):
+            latest[direction] = msg
+
+    lines = []
+    for direction, msg in sorted(latest.items(), key=lambda item: _email_ts(item[1])):
         body = msg.get("body", {})
         text = body.get("text", "") if isinstance(body, dict) else str(body)
-        conversation_text += f"[{direction}]: {text}\n"
+        lines.append(f"[{direction}]: {_strip_quoted(text)}\n")
+    return "".join(lines)
+
+
+def _sentiment_result(result: dict) -> dict:
+    return {
+        "reply_sentiment": result.get("reply_sentiment", "Neutral"),
+        "taken_off_list": result.get("taken_off_list", "no"),
+        "is_postponed": result.get("is_postponed", "false"),
+        "sentiment_notes": result.get("sentiment_notes", ""),
+    }
+
+
+def openai_classify_sentiment(messages: list[dict]) -> dict | None:
+    if not openai_client:
+        return None
 
     prompt = f"""Analyze this email conversation and classify the lead's response.
 
 Conversation:
-{conversation_text}
+{_conversation_text(messages)}
 
 Respond with a JSON object (no markdown, no code fences) with these fields:
-- "reply_sentiment": one of "Enthusiastic", "Positive", "Neutral", "Negative", "Postponed", "Not Yet Responded"
-- "taken_off_list": "yes" or "no" — is the lead asking to be removed, opting out, unsubscribing, saying "not interested", "remove me", "stop contacting", etc.?
-- "is_postponed": "true" or "false" — is the lead saying "not right now", "reach out later", "busy right now", "maybe next quarter", etc.?
-- "sentiment_notes": brief 1-2 sentence explanation of your classification"""
+{SENTIMENT_FIELDS}"""
 
     try:
         response = openai_client.chat.completions.create(
@@ -249,27 +503,53 @@ Respond with a JSON object (no markdown, no code fences) with these fields:
             messages=[{"role": "user", "content": prompt}],
             temperature=0,
         )
-        result = json.loads(response.choices[0].message.content.strip())
-        return {
-            "reply_sentiment": result.get("reply_sentiment", "Neutral"),
-            "taken_off_list": result.get("taken_off_list", "no"),
-            "is_postponed": result.get("is_postponed", "false"),
-            "sentiment_notes": result.get("sentiment_notes", ""),
-        }
+        return _sentiment_result(json.loads(response.choices[0].message.content.strip()))
     except Exception as e:
         log.warning(f"OpenAI sentiment failed, using keywords: {e}")
         return None
 
 
-def openai_classify_sector(campaign_name: str) -> str | None:
+def openai_classify_sentiment_batch(conversations: list[list[dict]]) -> list[dict | None]:
+    """
+    Classify several conversations (each a list of emails) in one OpenAI request.
+    Results line up with the input; any conversation missing from the answer is
+    retried on its own.
+    """
     if not openai_client:
-        return None
+        return [None] * len(conversations)
 
-    prompt = f"""Given this campaign name, classify it into the most specific sector.
+    sections = "\n".join(
+        f"### Conversation {n}\n{_conversation_text(messages)}" for n, messages in enumerate(conversations)
+    )
+    prompt = f"""Classify the lead's response in each of the following {len(conversations)} email conversations.
 
-Campaign name: "{campaign_name}"
+{sections}
+
+Respond with a JSON array (no markdown, no code fences) containing one object per conversation, with these fields:
+- "idx": the conversation number
+{SENTIMENT_FIELDS}"""
+
+    results = [None] * len(conversations)
+    try:
+        response = openai_client.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0,
+        )
+        for item in json.loads(response.choices[0].message.content.strip()):
+            n = item.get("idx")
+            if isinstance(n, int) and 0 <= n < len(conversations):
+                results[n] = _sentiment_result(item)
+    except Exception as e:
+        log.warning(f"OpenAI batch sentiment failed, classifying individually: {e}")
+
+    for n, messages in enumerate(conversations):
+        if not results[n]:
+            results[n] = openai_classify_sentiment(messages)
+    return results
 
-Pick the single best-fit sector from this list, or identify a more specific sector from the campaign name. NEVER return "Other".
+
+SECTOR_CHOICES = """Pick the single best-fit sector from this list, or identify a more specific sector from the campaign name. NEVER return "Other".
 
 Sectors:
 - Webinar — webinar-related campaigns
@@ -279,7 +559,18 @@ Sectors:
 - Political — political campaigns/orgs
 - Healthcare — healthcare sector
 - Tech — technology sector
-- Finance — financial services
+- Finance — financial services"""
+
+
+def openai_classify_sector(campaign_name: str) -> str | None:
+    if not openai_client:
+        return None
+
+    prompt = f"""Given this campaign name, classify it into the most specific sector.
+
+Campaign name: "{campaign_name}"
+
+{SECTOR_CHOICES}
 
 Respond with ONLY the sector name, nothing else."""
 
@@ -295,6 +586,39 @@ Respond with ONLY the sector name, nothing else."""
         return None
 
 
+def openai_classify_sectors(campaign_names: list[str]) -> dict[str, str]:
+    """Classify many campaign names in one OpenAI request; names it fails on are left out."""
+    if not openai_client or not campaign_names:
+        return {}
+
+    numbered = "\n".join(f'{n}. "{name}"' for n, name in enumerate(campaign_names))
+    prompt = f"""Classify each of the following {len(campaign_names)} campaign names into the most specific sector.
+
+{numbered}
+
+{SECTOR_CHOICES}
+
+Respond with a JSON object (no markdown, no code fences) mapping each campaign number (as a string) to its sector name."""
+
+    try:
+        response = openai_client.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0,
+        )
+        answer = json.loads(response.choices[0].message.content.strip())
+    except Exception as e:
+        log.warning(f"OpenAI batch sector failed, classifying individually: {e}")
+        return {}
+
+    sectors = {}
+    for n, name in enumerate(campaign_names):
+        sector = answer.get(str(n)) if isinstance(answer, dict) else None
+        if isinstance(sector, str) and sector.strip():
+            sectors[name] = sector.strip()
+    return sectors
+
+
 # ── Keyword-based fallback classification ─────────────────────────────────────
 
 OPT_OUT_PHRASES = [
@@ -334,6 +658,18 @@ NEGATIVE_PHRASES = [
     "we already use", "not looking", "doesn't apply", "spam",
 ]
 
+
+def _phrase_regex(phrases: list[str]) -> re.Pattern:
+    """Compile a phrase list into one case-insensitive alternation."""
+    return re.compile("|".join(re.escape(p) for p in phrases), re.IGNORECASE)
+
+
+_OPT_OUT_RE = _phrase_regex(OPT_OUT_PHRASES)
+_POSTPONE_RE = _phrase_regex(POSTPONE_PHRASES)
+_POSITIVE_RE = _phrase_regex(POSITIVE_PHRASES)
+_ENTHUSIASTIC_RE = _phrase_regex(ENTHUSIASTIC_PHRASES)
+_NEGATIVE_RE = _phrase_regex(NEGATIVE_PHRASES)
+
 SECTOR_PATTERNS = [
     ("webinar outreach", "Webinar Outreach"),
     ("webinar", "Webinar"),
@@ -372,17 +708,25 @@ SECTOR_PATTERNS = [
     ("startup", "Tech"),
 ]
 
+# One zero-width alternative per keyword so finditer reports every keyword
+# occurrence, overlapping or not; the lowest group index found is the first
+# SECTOR_PATTERNS entry that appears in the name, same as a linear scan.
+_SECTOR_RE = re.compile(
+    "|".join(f"(?=(?P<g{i}>{re.escape(kw)}))" for i, (kw, _) in enumerate(SECTOR_PATTERNS)),
+    re.IGNORECASE,
+)
+_SECTOR_NAMES = [sector_name for _, sector_name in SECTOR_PATTERNS]
+
 
 def keyword_classify_sentiment(messages: list[dict]) -> dict:
-    inbound_text = ""
+    parts = []
     for msg in messages:
         if msg.get("_email_type") == "received":
             body = msg.get("body", {})
-            text = body.get("text", "") if isinstance(body, dict) else str(body)
-            inbound_text += " " + text
-    inbound_lower = inbound_text.lower().strip()
+            parts.append(body.get("text", "") if isinstance(body, dict) else str(body))
+    inbound_text = " ".join(parts).strip()
 
-    if not inbound_lower:
+    if not inbound_text:
         return {
             "reply_sentiment": "Not Yet Responded",
             "taken_off_list": "no",
@@ -390,20 +734,8 @@ def keyword_classify_sentiment(messages: list[dict]) -> dict:
             "sentiment_notes": "No inbound messages found",
         }
 
-    taken_off = "no"
-    for phrase in OPT_OUT_PHRASES:
-        if phrase in inbound_lower:
-            taken_off = "yes"
-            break
-
-    is_postponed = "false"
-    for phrase in POSTPONE_PHRASES:
-        if phrase in inbound_lower:
-            is_postponed = "true"
-            break
-
-    sentiment = "Neutral"
-    notes = "Reply detected, classified by keyword matching."
+    taken_off = "yes" if _OPT_OUT_RE.search(inbound_text) else "no"
+    is_postponed = "true" if _POSTPONE_RE.search(inbound_text) else "false"
 
     if taken_off == "yes":
         sentiment = "Negative"
@@ -411,26 +743,18 @@ def keyword_classify_sentiment(messages: list[dict]) -> dict:
     elif is_postponed == "true":
         sentiment = "Postponed"
         notes = "Lead is interested but wants to revisit later."
+    elif _ENTHUSIASTIC_RE.search(inbound_text):
+        sentiment = "Enthusiastic"
+        notes = "Lead shows strong positive interest."
+    elif _POSITIVE_RE.search(inbound_text):
+        sentiment = "Positive"
+        notes = "Lead shows interest in continuing the conversation."
+    elif _NEGATIVE_RE.search(inbound_text):
+        sentiment = "Negative"
+        notes = "Lead indicates this is not relevant to them."
     else:
-        for phrase in ENTHUSIASTIC_PHRASES:
-            if phrase in inbound_lower:
-                sentiment = "Enthusiastic"
-                notes = "Lead shows strong positive interest."
-                break
-        if sentiment == "Neutral":
-            for phrase in POSITIVE_PHRASES:
-                if phrase in inbound_lower:
-                    sentiment = "Positive"
-                    notes = "Lead shows interest in continuing the conversation."
-                    break
-        if sentiment == "Neutral":
-            for phrase in NEGATIVE_PHRASES:
-                if phrase in inbound_lower:
-                    sentiment = "Negative"
-                    notes = "Lead indicates this is not relevant to them."
-                    break
-        if sentiment == "Neutral":
-            notes = "Reply received but could not determine clear sentiment from keywords."
+        sentiment = "Neutral"
+        notes = "Reply received but could not determine clear sentiment from keywords."
 
     return {
         "reply_sentiment": sentiment,
@@ -441,11 +765,11 @@ def keyword_classify_sentiment(messages: list[dict]) -> dict:
 
 
 def keyword_classify_sector(campaign_name: str) -> str:
-    name_lower = campaign_name.lower()
-    for keyword, sector_name in SECTOR_PATTERNS:
-        if keyword in name_lower:
-            return sector_name
-    return "Outreach"
+    best = min(
+        (int(m.lastgroup[1:]) for m in _SECTOR_RE.finditer(campaign_name)),
+        default=None,
+    )
+    return _SECTOR_NAMES[best] if best is not None else "Outreach"
 
 
 # ── Combined classifiers ─────────────────────────────────────────────────────
@@ -457,11 +781,25 @@ def classify_reply_sentiment(messages: list[dict]) -> dict:
     return keyword_classify_sentiment(messages)
 
 
-def classify_sector(campaign_name: str, cache: dict) -> str:
-    if campaign_name in cache:
-        return cache[campaign_name]
+# One pool for every campaign thread, so concurrent OpenAI requests stay at
+# OPENAI_MAX_WORKERS however many campaigns run at once.
+_openai_executor = ThreadPoolExecutor(max_workers=OPENAI_MAX_WORKERS, thread_name_prefix="openai")
 
-    sector = openai_classify_sector(campaign_name)
+
+def openai_classify_sentiments(conversations: list[list[dict]]) -> list[dict | None]:
+    """Classify many conversations with OpenAI in concurrent batches; None where it failed."""
+    batches = [
+        conversations[i : i + SENTIMENT_BATCH_SIZE]
+        for i in range(0, len(conversations), SENTIMENT_BATCH_SIZE)
+    ]
+    results = []
+    for batch_results in _openai_executor.map(openai_classify_sentiment_batch, batches):
+        results.extend(batch_results)
+    return results
+
+
+def _settle_sector(campaign_name: str, sector: str | None) -> str:
+    """Fall back to keywords when OpenAI gave no answer or answered "Other"."""
     if not sector:
         sector = keyword_classify_sector(campaign_name)
 
@@ -469,49 +807,72 @@ def classify_sector(campaign_name: str, cache: dict) -> str:
         sector = keyword_classify_sector(campaign_name)
         if sector.lower() == "other":
             sector = "Outreach"
+    return sector
+
+
+def classify_sector(campaign_name: str, cache: dict) -> str:
+    if campaign_name in cache:
+        return cache[campaign_name]
 
+    sector = _settle_sector(campaign_name, openai_classify_sector(campaign_name))
     cache[campaign_name] = sector
     return sector
 
 
+def classify_sectors(campaign_names: list[str], cache: dict):
+    """Fill `cache` for every campaign name with one batched OpenAI request."""
+    names = [name for name in dict.fromkeys(campaign_names) if name not in cache]
+    sectors = openai_classify_sectors(names)
+    for name in names:
+        # Names the batch missed fall through to a single-name request.
+        sector = sectors.get(name) or openai_classify_sector(name)
+        cache[name] = _settle_sector(name, sector)
+
+
 # ── Slack notifications ───────────────────────────────────────────────────────
 
-def parse_followup_date(reply_text: str) -> str:
-    text = reply_text.lower()
-    now = datetime.now(timezone.utc)
+# (pattern, fixed offset, kind) — checked in order, first match wins.
+_FOLLOWUP_PATTERNS = [
+    (re.compile(r"next quarter"), timedelta(days=90), "fixed"),
+    (re.compile(r"next year"), timedelta(days=365), "fixed"),
+    (re.compile(r"next month"), timedelta(days=30), "fixed"),
+    (re.compile(r"in (\d+)\s*months?"), None, "months"),
+    (re.compile(r"in (\d+)\s*weeks?"), None, "weeks"),
+    (re.compile(r"(\d+)\s*months?"), None, "months"),
+    (re.compile(r"(\d+)\s*weeks?"), None, "weeks"),
+    (re.compile(r"end of year"), None, "end_of_year"),
+    (re.compile(r"after the holidays"), timedelta(days=45), "fixed"),
+    (re.compile(r"beginning of next"), timedelta(days=30), "fixed"),
+    (re.compile(r"q([1-4])"), None, "quarter"),
+]
 
-    patterns = [
-        (r"next quarter", timedelta(days=90)),
-        (r"next year", timedelta(days=365)),
-        (r"next month", timedelta(days=30)),
-        (r"in (\d+)\s*months?", None),
-        (r"in (\d+)\s*weeks?", None),
-        (r"(\d+)\s*months?", None),
-        (r"(\d+)\s*weeks?", None),
-        (r"end of year", None),
-        (r"after the holidays", timedelta(days=45)),
-        (r"beginning of next", timedelta(days=30)),
-        (r"q[1-4]", None),
-    ]
+_QUARTER_START_MONTH = {"1": 1, "2": 4, "3": 7, "4": 10}
+
+
+def parse_followup_date(reply_text: str, today: date | None = None) -> str:
+    """Parse a postponed reply to determine when to follow up. Default: 2 weeks."""
+    return _parse_followup_date(reply_text.lower(), today or datetime.now(timezone.utc).date())
 
-    for pattern, delta in patterns:
-        match = re.search(pattern, text)
-        if match:
-            if delta:
-                return (now + delta).strftime("%Y-%m-%d")
-            if "month" in pattern:
-                months = int(match.group(1))
-                return (now + timedelta(days=months * 30)).strftime("%Y-%m-%d")
-            if "week" in pattern:
-                weeks = int(match.group(1))
-                return (now + timedelta(weeks=weeks)).strftime("%Y-%m-%d")
-            if "end of year" in pattern:
-                return f"{now.year}-12-31"
-            if pattern.startswith("q"):
-                q = text[match.start() + 1]
-                quarter_month = {"1": 1, "2": 4, "3": 7, "4": 10}.get(q, 1)
-                year = now.year if int(q) > (now.month - 1) // 3 + 1 else now.year + 1
-                return f"{year}-{quarter_month:02d}-01"
+
+@functools.lru_cache(maxsize=4096)
+def _parse_followup_date(text: str, now: date) -> str:
+    """Cached worker for parse_followup_date; pure in (lower-cased text, today)."""
+    for pattern, delta, kind in _FOLLOWUP_PATTERNS:
+        match = pattern.search(text)
+        if not match:
+            continue
+        if kind == "fixed":
+            return (now + delta).strftime("%Y-%m-%d")
+        if kind == "months":
+            return (now + timedelta(days=int(match.group(1)) * 30)).strftime("%Y-%m-%d")
+        if kind == "weeks":
+            return (now + timedelta(weeks=int(match.group(1)))).strftime("%Y-%m-%d")
+        if kind == "end_of_year":
+            return f"{now.year}-12-31"
+        if kind == "quarter":
+            q = match.group(1)
+            year = now.year if int(q) > (now.month - 1) // 3 + 1 else now.year + 1
+            return f"{year}-{_QUARTER_START_MONTH[q]:02d}-01"
 
     return (now + timedelta(weeks=2)).strftime("%Y-%m-%d")
 
@@ -521,7 +882,8 @@ def send_postponed_slack_notification(lead: dict):
         log.warning("SLACK_TOFU_REPLIES_WEBHOOK_URL not set — skipping Slack notification")
         return
 
-    followup_date = parse_followup_date(lead.get("latest_response_text", ""))
+    # extract_lead_data already parsed the reply for postponed leads
+    followup_date = lead.get("followup_date") or parse_followup_date(lead.get("latest_response_text", ""))
     name = f"{lead.get('firstname', '')} {lead.get('lastname', '')}".strip()
     company = lead.get("company", "")
     campaign = lead.get("latest_outbound_campaign", "")
@@ -544,7 +906,11 @@ def send_postponed_slack_notification(lead: dict):
     }
 
     try:
-        resp = requests.post(SLACK_TOFU_REPLIES_WEBHOOK_URL, json=message)
+        resp = slack_session.post(
+            SLACK_TOFU_REPLIES_WEBHOOK_URL,
+            data=orjson.dumps(message),
+            headers={"Content-Type": "application/json"},
+        )
         resp.raise_for_status()
         log.info(f"  Slack notification sent for {name} (follow up: {followup_date})")
     except Exception as e:
@@ -567,7 +933,9 @@ def to_midnight_ms(ts_str: str) -> str:
 
 # ── Lead extraction ───────────────────────────────────────────────────────────
 
-def extract_lead_data(lead: dict, emails: list[dict], campaign_name: str, sector_cache: dict) -> dict | None:
+def extract_lead_data(lead: dict, emails: list[dict], campaign_name: str, sector: str,
+                      sentiment: dict | None = None) -> dict | None:
+    """Build HubSpot contact properties for a lead. Pass `sentiment` if already classified."""
     email_addr = lead.get("email", "")
     if not email_addr:
         return None
@@ -578,28 +946,30 @@ def extract_lead_data(lead: dict, emails: list[dict], campaign_name: str, sector
     payload = lead.get("payload", {}) or {}
     job_title = payload.get("job_title", payload.get("title", payload.get("position", "")))
 
-    # Separate outbound and inbound emails
-    outbound = [e for e in emails if e.get("_email_type") == "sent"]
-    inbound = [e for e in emails if e.get("_email_type") == "received"]
-
-    has_responded = len(inbound) > 0
-
-    # Get latest outbound date
+    # One pass over the thread: latest outbound date, latest reply, reply count
     latest_outbound_date = ""
-    for e in outbound:
-        ts = e.get("timestamp_email", e.get("timestamp_created", ""))
-        if ts and ts > latest_outbound_date:
-            latest_outbound_date = ts
-
-    # Get latest inbound reply
-    latest_response_text = ""
     latest_response_date = ""
-    for e in inbound:
+    latest_response = None
+    response_count = 0
+    for e in emails:
+        email_type = e.get("_email_type")
         ts = e.get("timestamp_email", e.get("timestamp_created", ""))
-        if ts and ts > latest_response_date:
-            latest_response_date = ts
-            body = e.get("body", {})
-            latest_response_text = body.get("text", "") if isinstance(body, dict) else str(body)
+        if email_type == "sent":
+            if ts and ts > latest_outbound_date:
+                latest_outbound_date = ts
+        elif email_type == "received":
+            response_count += 1
+            if ts and ts > latest_response_date:
+                latest_response_date = ts
+                latest_response = e
+
+    # Only the winning reply's body is read
+    latest_response_text = ""
+    if latest_response is not None:
+        body = latest_response.get("body", {})
+        latest_response_text = body.get("text", "") if isinstance(body, dict) else str(body)
+
+    has_responded = response_count > 0
 
     # Classify sentiment if lead has replied
     sentiment_data = {
@@ -609,10 +979,7 @@ def extract_lead_data(lead: dict, emails: list[dict], campaign_name: str, sector
         "sentiment_notes": "",
     }
     if has_responded:
-        sentiment_data = classify_reply_sentiment(emails)
-
-    # Classify sector
-    sector = classify_sector(campaign_name, sector_cache)
+        sentiment_data = sentiment or classify_reply_sentiment(emails)
 
     # Compute follow-up date for postponed leads
     followup_date = ""
@@ -638,72 +1005,179 @@ def extract_lead_data(lead: dict, emails: list[dict], campaign_name: str, sector
         "followup_date": followup_date,
         "sector": sector,
         "sentiment_notes": sentiment_data["sentiment_notes"],
-        "response_count": str(len(inbound)),
+        "response_count": str(response_count),
     }
 
 
 # ── HubSpot helpers ───────────────────────────────────────────────────────────
 
-def hubspot_headers() -> dict:
-    return {
-        "Authorization": f"Bearer {HUBSPOT_ACCESS_TOKEN}",
-        "Content-Type": "application/json",
+def _upsert_batch(batch: list[dict]) -> dict:
+    """Upsert up to 100 leads keyed on email. Returns created/updated/errors/failed_batches counts."""
+    payload = {
+        "inputs": [
+            {
+                "idProperty": "email",
+                "id": lead["email"],
+                "properties": {k: v for k, v in lead.items() if v},
+            }
+            for lead in batch
+        ]
     }
 
+    try:
+        HUBSPOT_LIMITER.acquire()
+        resp = hubspot_session.post(
+            f"{HUBSPOT_BASE_URL}/crm/v3/objects/contacts/batch/upsert",
+            data=orjson.dumps(payload),
+        )
+        hubspot_throttle(resp)
+        resp.raise_for_status()
+        upserted = orjson.loads(resp.content).get("results", [])
+        created = sum(1 for result in upserted if result.get("new", False))
+        return {"created": created, "updated": len(upserted) - created, "errors": 0, "failed_batches": 0}
+
+    except requests.exceptions.HTTPError as e:
+        log.error(f"HubSpot batch upsert failed: {e}")
+        try:
+            log.error(f"Response: {resp.text[:500]}")
+        except Exception:
+            log.error("Could not read response body")
+    except Exception as e:
+        log.error(f"HubSpot batch upsert failed: {e}")
+    return {"created": 0, "updated": 0, "errors": len(batch), "failed_batches": 1}
+
 
 def batch_upsert_contacts(leads: list[dict]):
-    """Upsert contacts into HubSpot keyed on email."""
+    """Upsert contacts into HubSpot keyed on email, HUBSPOT_MAX_WORKERS batches at a time."""
+    results = {"created": 0, "updated": 0, "errors": 0, "failed_batches": 0}
     if not leads:
-        return {"created": 0, "updated": 0, "errors": 0}
+        return results
 
-    results = {"created": 0, "updated": 0, "errors": 0}
+    with ThreadPoolExecutor(max_workers=HUBSPOT_MAX_WORKERS) as executor:
+        batches = (leads[i : i + 100] for i in range(0, len(leads), 100))
+        for batch_results in executor.map(_upsert_batch, batches):
+            for key, count in batch_results.items():
+                results[key] += count
 
-    for i in range(0, len(leads), 100):
-        batch = leads[i : i + 100]
-        inputs = []
-        for lead in batch:
-            properties = {k: v for k, v in lead.items() if v}
-            inputs.append({
-                "idProperty": "email",
-                "id": lead["email"],
-                "properties": properties,
-            })
+    return results
 
-        payload = {"inputs": inputs}
 
-        try:
-            resp = requests.post(
-                f"{HUBSPOT_BASE_URL}/crm/v3/objects/contacts/batch/upsert",
-                headers=hubspot_headers(),
-                json=payload,
-            )
-            resp.raise_for_status()
-            data = resp.json()
+# ── Campaign processing ───────────────────────────────────────────────────────
 
-            for result in data.get("results", []):
-                if result.get("new", False):
-                    results["created"] += 1
-                else:
-                    results["updated"] += 1
+def process_campaign(campaign: dict, max_leads: int, updated_since: datetime | None,
+                     sector_cache: dict) -> tuple[list[dict], int | None, list[str]]:
+    """Fetch, classify and extract one campaign's leads.
 
-        except requests.exceptions.HTTPError as e:
-            log.error(f"HubSpot batch upsert failed: {e}")
-            try:
-                log.error(f"Response: {resp.text[:500]}")
-            except Exception:
-                log.error("Could not read response body")
-            results["errors"] += len(batch)
+    Returns (lead properties, leads fetched, error messages); leads fetched is
+    None when the campaign's leads couldn't be fetched at all. Safe to run for
+    several campaigns at once: Instantly calls share INSTANTLY_LIMITER, and
+    sector_cache only ever gains whole entries, so a race just repeats a lookup.
+    """
+    campaign_id = campaign.get("id")
+    campaign_name = campaign.get("name", f"Campaign-{campaign_id}")
+    log.info(f"Processing campaign: {campaign_name} (id={campaign_id})")
+    extracted = []
+    errors = []
+
+    try:
+        leads, campaign_size = get_leads_for_campaign(
+            campaign_id, max_leads=max_leads, updated_since=updated_since
+        )
+    except Exception as e:
+        log.error(f"  Failed to fetch leads for '{campaign_name}': {e}")
+        return extracted, None, [f"Campaign '{campaign_name}': {e}"]
+
+    log.info(f"  {campaign_name}: found {len(leads)} leads")
+
+    # Leads with replies reuse cached emails + sentiment when nothing new has
+    # arrived since the run that cached them.
+    cache_keys = {}
+    cached = {}
+    for i, lead in enumerate(leads):
+        if lead.get("email") and (lead.get("email_reply_count", 0) or 0) > 0:
+            cache_keys[i] = lead_cache_key(lead, campaign_id)
+            hit = lead_cache_get(cache_keys[i])
+            if hit:
+                cached[i] = hit
+    if cached:
+        log.info(f"  {campaign_name}: {len(cached)} replied leads unchanged since last run (cached)")
+
+    # Fetch the rest — in one campaign-wide pass when that takes fewer requests
+    # than going lead by lead, otherwise per lead, concurrently.
+    to_fetch = [i for i in cache_keys if i not in cached]
+    fetched = {}
+    bulk_pages = (
+        (campaign_size * BULK_EMAIL_SENT_PER_LEAD + len(to_fetch)) // 100 + 2
+        if campaign_size is not None else None
+    )
+    if to_fetch and bulk_pages is not None and bulk_pages < 2 * len(to_fetch):
+        try:
+            by_lead = get_emails_for_campaign(campaign_id, {leads[i]["email"] for i in to_fetch})
+            fetched = {i: by_lead[leads[i]["email"].lower()] for i in to_fetch}
         except Exception as e:
-            log.error(f"HubSpot batch upsert failed: {e}")
-            results["errors"] += len(batch)
+            log.warning(f"  {campaign_name}: bulk email fetch failed, fetching per lead: {e}")
+    if len(fetched) < len(to_fetch):
+        with ThreadPoolExecutor(max_workers=INSTANTLY_MAX_WORKERS) as executor:
+            email_futures = {
+                i: executor.submit(get_emails_for_lead, leads[i]["email"], campaign_id)
+                for i in to_fetch
+            }
+        for i, emails_future in email_futures.items():
+            try:
+                fetched[i] = emails_future.result()
+            except Exception as e:
+                log.error(f"  Failed to fetch emails for {leads[i]['email']}: {e}")
+                errors.append(f"Emails for {leads[i]['email']}: {e}")
 
-        time.sleep(0.5)
+    lead_emails = [
+        cached[i]["emails"] if i in cached else fetched.get(i, [])
+        for i in range(len(leads))
+    ]
 
-    return results
+    # Classify every new replied conversation in the campaign up front, in batches.
+    sentiments = {i: hit["sentiment"] for i, hit in cached.items()}
+    replied = [
+        i for i, emails in enumerate(lead_emails)
+        if i not in cached and any(e.get("_email_type") == "received" for e in emails)
+    ]
+    new_entries = {}
+    for i, result in zip(replied, openai_classify_sentiments([lead_emails[i] for i in replied])):
+        if result:
+            # Only OpenAI answers are cached, so a keyword fallback is retried next run.
+            new_entries[cache_keys[i]] = {"emails": lead_emails[i], "sentiment": result}
+        sentiments[i] = result or keyword_classify_sentiment(lead_emails[i])
+    lead_cache_set_many(new_entries)
+
+    sector = classify_sector(campaign_name, sector_cache)
+    for i, (lead, emails) in enumerate(zip(leads, lead_emails)):
+        lead_email = lead.get("email", "")
+        if not lead_email:
+            continue
+        if i in cache_keys and i not in cached and i not in fetched:
+            # Without its emails the lead would be synced as "Not Yet Responded".
+            continue
+
+        try:
+            lead_data = extract_lead_data(lead, emails, campaign_name, sector, sentiments.get(i))
+            if lead_data:
+                extracted.append(lead_data)
+                log.info(f"  Extracted lead: {lead_data['firstname']} {lead_data['lastname']} ({lead_data['email']})")
+        except Exception as e:
+            log.error(f"  Failed to process lead {lead_email}: {e}")
+            errors.append(f"Lead {lead_email}: {e}")
+
+    return extracted, len(leads), errors
 
 
 # ── Main ──────────────────────────────────────────────────────────────────────
 
+def _lead_rank(lead: dict) -> tuple[bool, int]:
+    """Dedup preference: replied leads first, then the most recent response."""
+    if lead["has_responded"] != "true":
+        return (False, 0)
+    return (True, int(lead.get("latest_response_date") or 0))
+
+
 def main():
     parser = argparse.ArgumentParser(description="Instantly → HubSpot sync")
     parser.add_argument("--limit", type=int, default=0,
@@ -724,8 +1198,11 @@ def main():
     # 1. Load last run state
     last_run = load_last_run()
     now = datetime.now(timezone.utc)
+    updated_since = None
     if last_run:
-        log.info(f"Incremental sync — pulling leads updated since {last_run}")
+        # Overlap the previous run so leads updated while it was running aren't missed.
+        updated_since = datetime.fromisoformat(last_run) - SYNC_OVERLAP
+        log.info(f"Incremental sync — pulling leads updated since {updated_since.isoformat()}")
     else:
         log.info("First run — pulling all leads")
 
@@ -745,88 +1222,74 @@ def main():
         log.info(f"Limiting to first {args.limit} campaigns (of {len(campaigns)})")
         campaigns = campaigns[:args.limit]
 
-    # 3. Process each campaign
-    all_leads = []
+    # 3. Process campaigns concurrently; results come back in campaign order and
+    #    are deduplicated by email as they are merged.
+    seen = {}
     postponed_leads = []
-    sector_cache = {}
+    sector_entries = load_sector_cache(now)
+    sector_cache = {name: entry["sector"] for name, entry in sector_entries.items()}
     total_leads_fetched = 0
     errors = []
-
-    for campaign in campaigns:
-        campaign_id = campaign.get("id")
-        campaign_name = campaign.get("name", f"Campaign-{campaign_id}")
-        log.info(f"Processing campaign: {campaign_name} (id={campaign_id})")
-
-        try:
-            leads = get_leads_for_campaign(campaign_id, max_leads=args.max_leads)
-        except Exception as e:
-            log.error(f"  Failed to fetch leads for '{campaign_name}': {e}")
-            errors.append(f"Campaign '{campaign_name}': {e}")
-            continue
-
-        log.info(f"  Found {len(leads)} leads")
-        total_leads_fetched += len(leads)
-
-        for lead in leads:
-            lead_email = lead.get("email", "")
-            if not lead_email:
-                continue
-
-            # Check if lead has replies — only fetch emails if reply_count > 0
-            reply_count = lead.get("email_reply_count", 0) or 0
-
-            emails = []
-            if reply_count > 0:
-                try:
-                    emails = get_emails_for_lead(lead_email, campaign_id)
-                except Exception as e:
-                    log.warning(f"  Failed to fetch emails for {lead_email}: {e}")
-
-            try:
-                lead_data = extract_lead_data(lead, emails, campaign_name, sector_cache)
-                if lead_data:
-                    all_leads.append(lead_data)
-                    log.info(f"  Extracted lead: {lead_data['firstname']} {lead_data['lastname']} ({lead_data['email']})")
-
-                    if lead_data["is_postponed"] == "true":
-                        postponed_leads.append(lead_data)
-
-            except Exception as e:
-                log.error(f"  Failed to process lead {lead_email}: {e}")
-                errors.append(f"Lead {lead_email}: {e}")
-
-        time.sleep(0.2)
-
-    # Deduplicate by email
-    seen = {}
-    for lead in all_leads:
-        key = lead.get("email", "").strip().lower()
-        if not key:
-            continue
-
-        if key not in seen:
-            seen[key] = lead
-        else:
-            existing = seen[key]
-            if lead["has_responded"] == "true" and existing["has_responded"] != "true":
-                seen[key] = lead
-            elif (lead["has_responded"] == "true" and existing["has_responded"] == "true"
-                  and lead.get("latest_response_date", "") > existing.get("latest_response_date", "")):
-                seen[key] = lead
+    failed_campaigns = 0
+
+    # Classify every campaign's sector up front so extraction only does lookups.
+    classify_sectors(
+        [campaign.get("name", f"Campaign-{campaign.get('id')}") for campaign in campaigns],
+        sector_cache,
+    )
+
+    def process(campaign: dict):
+        return process_campaign(campaign, args.max_leads, updated_since, sector_cache)
+
+    with ThreadPoolExecutor(max_workers=min(CAMPAIGN_MAX_WORKERS, len(campaigns))) as executor:
+        for campaign_leads, leads_fetched, campaign_errors in executor.map(process, campaigns):
+            for lead in campaign_leads:
+                if lead["is_postponed"] == "true":
+                    postponed_leads.append(lead)
+                key = lead["email"].strip().lower()
+                existing = seen.get(key)
+                if existing is None or _lead_rank(lead) > _lead_rank(existing):
+                    seen[key] = lead
+            if leads_fetched is None:
+                failed_campaigns += 1
+            else:
+                total_leads_fetched += leads_fetched
+            errors.extend(campaign_errors)
 
     all_leads = list(seen.values())
     log.info(f"Total unique leads to sync: {len(all_leads)}")
 
+    if updated_since is not None:
+        # A reply recorded from a campaign this run didn't pull must not be
+        # overwritten with "Not Yet Responded".
+        for lead in all_leads:
+            if lead["has_responded"] != "true":
+                for prop in REPLY_PROPERTIES:
+                    lead.pop(prop, None)
+
     # 4. Upsert into HubSpot
     if all_leads:
         log.info("Upserting contacts into HubSpot...")
         results = batch_upsert_contacts(all_leads)
     else:
-        results = {"created": 0, "updated": 0, "errors": 0}
+        results = {"created": 0, "updated": 0, "errors": 0, "failed_batches": 0}
         log.info("No leads to sync")
 
-    # 5. Save state
-    save_last_run(now)
+    # 5. Save state — a campaign whose leads couldn't be fetched or a batch
+    #    HubSpot didn't take would be filtered out of the next run, so keep the
+    #    old cutoff for those. Per-lead errors are logged below and don't hold
+    #    it back; a lead that always fails would otherwise force full re-syncs.
+    if failed_campaigns or results["failed_batches"]:
+        log.warning("Campaign fetch or HubSpot batch failed — keeping the previous last_run so it is retried")
+    else:
+        save_last_run(now)
+    new_sectors = {
+        name: {"sector": sector, "classified_at": now.isoformat()}
+        for name, sector in sector_cache.items() if name not in sector_entries
+    }
+    if new_sectors:
+        # Expired entries still on disk are dropped here, and ignored on load until then.
+        save_sector_cache({**sector_entries, **new_sectors})
 
     # 6. Summary
     log.info("=" * 60)
@@ -8,14 +8,19 @@ and transcript semantic search.
 Uses the official MCP Python SDK with streamable-http transport.
 """
 
+import atexit
+import functools
 import os
 import base64
+import threading
 import requests as http_requests
 from datetime import datetime, timedelta
 
 from openai import OpenAI
 from pymongo import MongoClient
 from mcp.server.fastmcp import FastMCP
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # ============================================================================
 # CONFIGURATION
@@ -32,24 +37,38 @@ OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
 # API CLIENTS
 # ============================================================================
 
+# Pooled keep-alive connections to Gong, shared by every tool call.
+GONG_SESSION = http_requests.Session()
+GONG_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=16,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=[429, 502, 503, 504],
+        allowed_methods=["GET", "POST"],
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    ),
+))
+
+# Gong uses Basic Auth with API key as username and secret as password;
+# encode it once rather than on every request.
+_gong_auth = base64.b64encode(f"{GONG_API_KEY}:{GONG_API_SECRET}".encode("ascii")).decode("ascii")
+GONG_SESSION.headers.update({
+    "Authorization": f"Basic {_gong_auth}",
+    "Content-Type": "application/json",
+})
+
 
 def gong_request(method, endpoint, json_data=None, params=None):
     """Make a request to Gong API with Basic Auth."""
-    auth_string = f"{GONG_API_KEY}:{GONG_API_SECRET}"
-    base64_auth = base64.b64encode(auth_string.encode("ascii")).decode("ascii")
-
-    headers = {
-        "Authorization": f"Basic {base64_auth}",
-        "Content-Type": "application/json",
-    }
-
     url = f"{GONG_BASE_URL}{endpoint}"
 
     try:
-        if method == "GET":
-            response = http_requests.get(url, headers=headers, params=params)
-        elif method == "POST":
-            response = http_requests.post(url, headers=headers, json=json_data)
+        response = GONG_SESSION.request(
+            method, url, json=json_data, params=params, timeout=(3.05, 30)
+        )
 
         if response.status_code == 200:
             return response.json()
@@ -59,18 +78,35 @@ def gong_request(method, endpoint, json_data=None, params=None):
         return None
 
 
+# One MongoClient per process: it is thread-safe and pools its own connections.
+# Created on first use, after configuration has been validated.
+_mongo_client = None
+_mongo_client_lock = threading.Lock()
+
+
 def get_mongo_collection():
     """Get the MongoDB collection for transcript chunks."""
-    client = MongoClient(MONGODB_URI)
-    db = client["gong"]
-    return client, db["gong_transcripts"]
+    global _mongo_client
+    with _mongo_client_lock:
+        if _mongo_client is None:
+            _mongo_client = MongoClient(MONGODB_URI, maxPoolSize=50)
+            atexit.register(_mongo_client.close)
+    return _mongo_client["gong"]["gong_transcripts"]
+
+
+# Reused across requests so the HTTP connection pool to OpenAI stays warm.
+_openai_client = OpenAI(api_key=OPENAI_API_KEY) if OPENAI_API_KEY else None
+
+
+@functools.lru_cache(maxsize=1024)
+def _cached_embedding(text):
+    response = _openai_client.embeddings.create(model="text-embedding-3-small", input=text)
+    return tuple(response.data[0].embedding)
 
 
 def embed_query(text):
-    """Embed a query string using OpenAI."""
-    client = OpenAI(api_key=OPENAI_API_KEY)
-    response = client.embeddings.create(model="text-embedding-3-small", input=text)
-    return response.data[0].embedding
+    """Embed a query string using OpenAI; repeated queries are served from memory."""
+    return list(_cached_embedding(text))
 
 
 # ============================================================================
@@ -92,10 +128,11 @@ def search_gong_calls(
     """Search Gong calls by date range. Returns call IDs, titles, participants, and recording URLs.
     Defaults to last 7 days if no dates provided.
     IMPORTANT: Always include the call url from results as clickable links when presenting findings to the user."""
+    now = datetime.now()
     if not to_date:
-        to_date = datetime.now().strftime("%Y-%m-%d")
+        to_date = now.strftime("%Y-%m-%d")
     if not from_date:
-        from_date = (datetime.now() - timedelta(days=7)).strftime("%Y-%m-%d")
+        from_date = (now - timedelta(days=7)).strftime("%Y-%m-%d")
 
     params = {
         "fromDateTime": f"{from_date}T00:00:00Z",
@@ -129,13 +166,7 @@ def search_gong_calls(
 def get_call_transcript(call_id: str) -> dict:
     """Get the full transcript of a Gong call, broken down by speaker segments.
     When summarizing a transcript, always link back to the Gong recording URL."""
-    payload = {
-        "filter": {
-            "fromDateTime": (datetime.now() - timedelta(days=365)).strftime("%Y-%m-%dT00:00:00Z"),
-            "toDateTime": datetime.now().strftime("%Y-%m-%dT23:59:59Z"),
-            "callIds": [call_id],
-        }
-    }
+    payload = {"filter": {"callIds": [call_id]}}
 
     result = gong_request("POST", "/v2/calls/transcript", json_data=payload)
 
@@ -179,9 +210,19 @@ def search_transcripts(
     if not MONGODB_URI or not OPENAI_API_KEY:
         return {"error": "MONGODB_URI and OPENAI_API_KEY must be configured"}
 
+    # Reject bad dates before paying for an embedding.
+    date_match = {}
+    try:
+        if from_date:
+            date_match["$gte"] = datetime.fromisoformat(from_date)
+        if to_date:
+            date_match["$lte"] = datetime.fromisoformat(to_date + "T23:59:59")
+    except ValueError:
+        return {"error": "from_date and to_date must be YYYY-MM-DD"}
+
     query_embedding = embed_query(query)
 
-    fetch_limit = limit * 3 if (from_date or to_date) else limit
+    fetch_limit = limit * 3 if date_match else limit
 
     pipeline = [
         {
@@ -210,35 +251,26 @@ def search_transcripts(
         },
     ]
 
-    if from_date or to_date:
-        date_match = {}
-        if from_date:
-            date_match["$gte"] = datetime.fromisoformat(from_date)
-        if to_date:
-            date_match["$lte"] = datetime.fromisoformat(to_date + "T23:59:59")
+    if date_match:
         pipeline.append({"$match": {"call_date": date_match}})
 
     pipeline.append({"$limit": limit})
 
-    mongo_client, collection = get_mongo_collection()
-
-    try:
-        results = list(collection.aggregate(pipeline))
-    except Exception as e:
-        mongo_client.close()
-        return {"error": f"Vector search failed: {str(e)}"}
+    collection = get_mongo_collection()
 
     matching_calls = []
     seen_call_ids = set()
 
-    for r in results:
-        r["_id"] = str(r["_id"])
-        if r.get("call_date"):
-            r["call_date"] = r["call_date"].isoformat()
-        matching_calls.append(r)
-        seen_call_ids.add(r.get("call_id"))
-
-    mongo_client.close()
+    try:
+        # Walk the cursor directly; documents arrive in batches sized to the request.
+        for r in collection.aggregate(pipeline, batchSize=min(limit, 100)):
+            r["_id"] = str(r["_id"])
+            if r.get("call_date"):
+                r["call_date"] = r["call_date"].isoformat()
+            matching_calls.append(r)
+            seen_call_ids.add(r.get("call_id"))
+    except Exception as e:
+        return {"error": f"Vector search failed: {str(e)}"}
 
     return {
         "query": query,
@@ -0,0 +1,68 @@
+"""
+Shared call-pacing helpers
+==========================
+
+Thread-safe circuit breaker and rate limiter used by the Gong ingest, the
+HeyReach/Instantly syncs and the follow-up checker.
+"""
+
+import collections
+import threading
+import time
+
+
+class CircuitBreaker:
+    """Stop calling a service after `threshold` consecutive failures.
+
+    Once open, calls are refused for `cooldown` seconds; after that a single
+    trial call is let through and one more failure re-opens the breaker.
+    """
+
+    def __init__(self, name: str, threshold: int = 5, cooldown: float = 60):
+        self.name = name
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.failures < self.threshold:
+                return True
+            if time.monotonic() - self.opened_at >= self.cooldown:
+                self.failures = self.threshold - 1
+                return True
+            return False
+
+    def record(self, ok: bool):
+        with self._lock:
+            if ok:
+                self.failures = 0
+                return
+            self.failures += 1
+            if self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+
+
+class RateLimiter:
+    """Allow at most `calls` requests per `period` seconds, shared across threads."""
+
+    def __init__(self, calls: int, period: float):
+        self.calls = calls
+        self.period = period
+        self._sent = collections.deque()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until another request fits in the window."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self._sent and now - self._sent[0] >= self.period:
+                    self._sent.popleft()
+                if len(self._sent) < self.calls:
+                    self._sent.append(now)
+                    return
+                wait = self.period - (now - self._sent[0])
+            time.sleep(wait)